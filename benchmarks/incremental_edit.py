@@ -0,0 +1,85 @@
+# Cost of re-linting one edit with IncrementalLinter against a full lint of
+# the same synthetic module: a line changed in place, a line inserted and a
+# line deleted at random positions. Each sample is the edit together with
+# the first read of the findings at their new lines, the time an editor waits
+# for feedback. Deletes leave the lines that open or close a block alone: an
+# unclosed block makes the rest of the module one segment, and every later
+# edit re-indexes all of it (see IncrementalLinter).
+#
+#   python benchmarks/incremental_edit.py [--lines N] [--edits E]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lint import IncrementalLinter  # noqa: E402
+
+BLOCK_KEYWORDS = {'module', 'endmodule', 'always', 'begin', 'end', 'case', 'endcase'}
+BLOCK_LINES = [
+    "    reg [7:0] data_{n}, addr_{n};\n",
+    "    always @(posedge clk) begin\n",
+    "        data_{n} <= addr_{n} + 8'h01;\n",
+    "        case (sel)\n",
+    "            2'b00: addr_{n} = data_{n};\n",
+    "            2'b01: addr_{n} = 8'h00;\n",
+    "        endcase\n",
+    "    end\n",
+    "    // stage {n}\n",
+    "    assign out_{n} = data_{n} & mask;\n",
+]
+
+
+def make_module(count):
+    lines = ["module synthetic(input clk, input [1:0] sel, input [7:0] mask);\n"]
+    n = 0
+    while len(lines) < count - 1:
+        lines.extend(line.format(n=n) for line in BLOCK_LINES)
+        n += 1
+    lines.append("endmodule\n")
+    return lines
+
+
+def statement_line(lines):
+    while True:
+        line = random.randint(2, len(lines) - 1)
+        if BLOCK_KEYWORDS.isdisjoint(lines[line - 1].replace('(', ' ').split()):
+            return line
+
+
+def median_ms(samples):
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=50000)
+    parser.add_argument('--edits', type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    linter = IncrementalLinter()
+    start = time.perf_counter()
+    linter.lint(make_module(args.lines))
+    linter.errors
+    print(f"{'full lint':<10} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    edits = {
+        'replace': lambda line: linter.edit(line, line, [linter.lines[line - 1].replace('=', ' = ')]),
+        'insert': lambda line: linter.edit(line, line - 1, ["    // inserted\n"]),
+        'delete': lambda line: linter.edit(line, line, []),
+    }
+    for label, edit in edits.items():
+        samples = []
+        for _ in range(args.edits):
+            line = statement_line(linter.lines) if label == 'delete' else random.randint(2, len(linter.lines) - 1)
+            start = time.perf_counter()
+            edit(line)
+            linter.errors
+            samples.append(time.perf_counter() - start)
+        print(f"{label:<10} {median_ms(samples):8.1f} ms median {max(samples) * 1000:8.1f} ms max  (edit and read)")
+
+
+if __name__ == '__main__':
+    main()
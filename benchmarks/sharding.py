@@ -0,0 +1,47 @@
+# Wall time of the CLI linting a directory of many small files plus one large
+# flat netlist with the single-host process pool and with the shard
+# coordinator feeding the same number of local worker processes, which stand
+# in for the nodes of a distributed run.
+#
+#   python benchmarks/sharding.py [--files N] [--file-lines N] [--netlist-lines N] [--workers W] [--shards S]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from throughput import write_design
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--file-lines', type=int, default=400)
+    parser.add_argument('--netlist-lines', type=int, default=40000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--shards', type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for n in range(args.files):
+            write_design(os.path.join(directory, f'block_{n}.v'), 'always_blocks', args.file_lines)
+        write_design(os.path.join(directory, 'netlist.v'), 'flat_netlist', args.netlist_lines)
+        report = os.path.join(directory, 'lint_report.txt')
+        command = [sys.executable, os.path.join(ROOT, 'lint.py'), directory, '-o', report, '--no-cache',
+                   '--no-preprocess']
+        cases = {
+            'process pool': command + ['-j', str(args.workers)],
+            'shards': command + ['--coordinate', '127.0.0.1:0', '--local-workers', str(args.workers),
+                                 '--shards', str(args.shards)],
+        }
+        for label, case in cases.items():
+            start = time.perf_counter()
+            subprocess.run(case, check=True, stdout=subprocess.DEVNULL)
+            print(f"{label:<14} {time.perf_counter() - start:8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# Loading and linting one large synthetic netlist from a list of lines read
+# with readlines() against a memory-mapped SourceBuffer. Each mode runs in a
+# fresh process that reports the time to open the input, to tokenize it, to
+# lint it, and its peak RSS.
+#
+#   python benchmarks/source_buffer.py [--lines N] [--design NAME]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lint import SourceBuffer, SourceIndex, VerilogLinter  # noqa: E402
+from throughput import DESIGNS, write_design  # noqa: E402
+
+MODES = ('lines', 'buffer')
+
+
+# Runs in the child process.
+def measure(path, mode):
+    start = time.perf_counter()
+    if mode == 'lines':
+        with open(path) as f:
+            source = f.readlines()
+    else:
+        source = SourceBuffer.open(path)
+    opened = time.perf_counter()
+    SourceIndex(source, analyses=('tokens',))
+    tokenized = time.perf_counter()
+    VerilogLinter().parse_lines(path, source)
+    linted = time.perf_counter()
+    import resource
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_rss_kb //= 1024
+    json.dump({'open': opened - start, 'tokenize': tokenized - opened, 'lint': linted - tokenized,
+               'peak_rss_mb': peak_rss_kb / 1024}, sys.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--design', choices=sorted(DESIGNS), default='flat_netlist')
+    parser.add_argument('--measure', nargs=2, metavar=('PATH', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f'{args.design}.v')
+        lines = write_design(path, args.design, args.lines)
+        print(f"{args.design}: {lines} lines, {os.path.getsize(path) / 2 ** 20:.1f} MB")
+        for mode in MODES:
+            command = [sys.executable, os.path.abspath(__file__), '--measure', path, mode]
+            result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+            print(f"{mode:<7} open {result['open'] * 1000:8.1f} ms  tokenize {result['tokenize']:6.2f} s  "
+                  f"lint {result['lint']:6.2f} s  {result['peak_rss_mb']:7.1f} MB peak")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Wall time of starting the linter: a bare interpreter, importing lint, and a
+# full CLI run on one small file with and without the result cache. Each case
+# is a fresh process, as in a pipeline that runs the linter once per file.
+#
+#   python benchmarks/startup_time.py [--runs N]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SMALL_MODULE = """module counter(input clk, input rst, output reg [3:0] count);
+    always @(posedge clk) begin
+        if (rst)
+            count <= 4'b0000;
+        else
+            count <= count + 1;
+    end
+endmodule
+"""
+
+
+def median_ms(command, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'counter.v')
+        with open(source, 'w') as f:
+            f.write(SMALL_MODULE)
+        report = os.path.join(directory, 'lint_report.txt')
+        cache = os.path.join(directory, 'cache.sqlite3')
+
+        cases = {
+            'interpreter': [sys.executable, '-c', 'pass'],
+            'import lint': [sys.executable, '-c', 'import lint'],
+            'cli no-cache': [sys.executable, '-m', 'lint', source, '-o', report, '--no-cache'],
+            'cli cached': [sys.executable, '-m', 'lint', source, '-o', report, '--cache-path', cache],
+        }
+        for label, command in cases.items():
+            print(f"{label:<14} {median_ms(command, args.runs):8.1f} ms median")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+# Worst-case throughput of the linter on large synthetic designs. Each
+# generator writes one design shape at a given size in lines, and every design
+# and size is linted in a fresh process that reports lines/sec, its peak RSS
+# and the --profile time of each rule. The smallest and largest size give each
+# rule's scaling exponent (1.0 is linear); the default sizes are large enough
+# that every rule takes longer than the noise floor in at least one design.
+# Results are compared against the stored baseline, and a rule that got
+# slower per line, or grows faster with size than it used to, fails the run.
+#
+#   python benchmarks/throughput.py [--designs NAME,...] [--sizes N,...] [--stream] [--repeat R]
+#                                   [--tolerance X] [--baseline PATH] [--save-baseline]
+#
+# Everything is generated locally. Sizes of tens of millions of lines give
+# multi-GB netlists; add --stream for those so the input is never held in
+# memory, and --keep DIR to reuse the generated files between runs.
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lint import VerilogLinter  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'throughput_baseline.json')
+# Rule times below this many seconds are timer noise and never compared. The
+# fastest of --repeat runs is kept, which holds a 1 ms rule steady to a few
+# percent; a rule that has nothing to do in a design stays well below it.
+NOISE_SECONDS = 0.001
+# How much a rule's scaling exponent may grow over the baseline's.
+EXPONENT_MARGIN = 0.4
+
+
+# Each generator yields the lines of one design of about size lines.
+def always_blocks(size):
+    yield "module always_blocks(input clk, input rst, input [7:0] in, output reg [7:0] out);\n"
+    n = 0
+    emitted = 1
+    while emitted < size - 1:
+        block = [
+            f"    reg [7:0] state_{n}, next_{n};\n",
+            "    always @(posedge clk) begin\n",
+            "        if (rst)\n",
+            f"            state_{n} <= 8'h00;\n",
+            "        else\n",
+            f"            state_{n} <= next_{n};\n",
+            "    end\n",
+            f"    always @(state_{n} or in) begin\n",
+            f"        next_{n} = state_{n} + in;\n",
+            f"        out = next_{n};\n",
+            "    end\n",
+        ]
+        yield from block
+        emitted += len(block)
+        n += 1
+    yield "endmodule\n"
+
+
+# Case statements on a 16-bit selector, one item per value with a nested case
+# in every item, so the coverage analysis sees thousands of labels per case.
+def deep_case(size):
+    yield "module deep_case(input [15:0] sel, input [1:0] sub, output reg [7:0] out);\n"
+    emitted = 1
+    n = 0
+    while emitted < size - 1:
+        yield "    always @(*) begin\n"
+        yield "        case (sel)\n"
+        emitted += 2
+        for value in range(1 << 16):
+            if emitted >= size - 5:
+                break
+            item = [
+                f"            16'd{value}: case (sub)\n",
+                f"                2'b00: out = 8'd{value & 255};\n",
+                "                2'b01, 2'b1?: out = 8'h00;\n",
+                "            endcase\n",
+            ]
+            yield from item
+            emitted += len(item)
+        yield "        endcase\n"
+        yield "    end\n"
+        emitted += 2
+        n += 1
+    yield "endmodule\n"
+
+
+def wide_bus(size):
+    yield "module wide_bus(input clk, input [1023:0] in, output reg [1023:0] out);\n"
+    yield "    reg [1023:0] mem [0:255];\n"
+    emitted = 2
+    n = 0
+    while emitted < size - 1:
+        block = [
+            f"    reg [1023:0] bus_{n};\n",
+            f"    reg [511:0] half_{n};\n",
+            "    always @(posedge clk) begin\n",
+            f"        bus_{n} <= in ^ mem[{n % 256}];\n",
+            f"        half_{n} <= bus_{n}[1023:512] + bus_{n}[511:0];\n",
+            f"        mem[{n % 256}] <= {{half_{n}, half_{n}}};\n",
+            f"        out <= bus_{n} * in;\n",
+            "    end\n",
+        ]
+        yield from block
+        emitted += len(block)
+        n += 1
+    yield "endmodule\n"
+
+
+def assigns(size):
+    yield "module assigns(input [31:0] a, input [31:0] b, output [31:0] y);\n"
+    yield "    wire [31:0] w_0;\n"
+    yield "    assign w_0 = a & b;\n"
+    emitted = 3
+    n = 1
+    while emitted < size - 2:
+        yield f"    wire [31:0] w_{n};\n"
+        yield f"    assign w_{n} = w_{n - 1} + (a ^ b);\n"
+        emitted += 2
+        n += 1
+    yield f"    assign y = w_{n - 1};\n"
+    yield "endmodule\n"
+
+
+# A synthesized gate-level netlist: one flat module of wires and primitive
+# instances, with no processes at all.
+def flat_netlist(size):
+    yield "module flat_netlist(input clk, input [63:0] in, output [63:0] out);\n"
+    emitted = 1
+    n = 0
+    while emitted < size - 2:
+        yield f"    wire n_{n}, m_{n};\n"
+        yield f"    and g_{n} (n_{n}, in[{n % 64}], m_{n});\n"
+        yield f"    DFF r_{n} (.CK(clk), .D(n_{n}), .Q(m_{n}));\n"
+        emitted += 3
+        n += 1
+    yield "    assign out = in;\n"
+    yield "endmodule\n"
+
+
+DESIGNS = {
+    'always_blocks': always_blocks,
+    'deep_case': deep_case,
+    'wide_bus': wide_bus,
+    'assigns': assigns,
+    'flat_netlist': flat_netlist,
+}
+
+
+def write_design(path, design, size):
+    lines = 0
+    with open(path, 'w') as f:
+        for line in DESIGNS[design](size):
+            f.write(line)
+            lines += 1
+    return lines
+
+
+# Seconds a fixed pure-Python loop takes on this machine right now. The whole
+# run's time is compared against the baseline in units of it, so a slower or
+# busier machine does not read as a regression; each rule is compared by its
+# share of the run.
+def calibrate():
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        sum(i * i for i in range(1000000))
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+# Runs in the child process: lints one file repeat times with profiling on and
+# prints the fastest time of the run and of each rule as JSON.
+def measure(path, stream, repeat):
+    calibration = calibrate()
+    seconds = None
+    rules = {}
+    for _ in range(repeat):
+        linter = VerilogLinter(profile=True)
+        start = time.perf_counter()
+        if stream:
+            linter.parse_verilog_stream(path)
+        else:
+            linter.parse_verilog(path)
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+        for name, stats in linter.stats.rules.items():
+            rules[name] = min(rules.get(name, stats['seconds']), stats['seconds'])
+    try:
+        import resource
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            peak_rss_kb //= 1024
+    except ImportError:
+        peak_rss_kb = None
+    json.dump({'seconds': seconds, 'calibration': calibration, 'peak_rss_kb': peak_rss_kb, 'rules': rules},
+              sys.stdout)
+
+
+def run_design(directory, design, size, stream, repeat):
+    path = os.path.join(directory, f'{design}_{size}.v')
+    if os.path.exists(path):
+        with open(path) as f:
+            lines = sum(1 for _ in f)
+    else:
+        lines = write_design(path, design, size)
+    command = [sys.executable, os.path.abspath(__file__), '--measure', path, '--repeat', str(repeat)]
+    if stream:
+        command.append('--stream')
+    result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+    result['lines'] = lines
+    result['lines_per_second'] = lines / result['seconds'] if result['seconds'] else None
+    return result
+
+
+# Per rule, log(time ratio) / log(size ratio) between the smallest and the
+# largest size; rules too fast to time at the smallest size are left out.
+def scaling_exponents(runs):
+    sizes = sorted(runs, key=int)
+    if len(sizes) < 2:
+        return {}
+    small, large = runs[sizes[0]], runs[sizes[-1]]
+    exponents = {}
+    for name, seconds in small['rules'].items():
+        if seconds < NOISE_SECONDS or name not in large['rules']:
+            continue
+        exponents[name] = math.log(large['rules'][name] / seconds) / math.log(large['lines'] / small['lines'])
+    return exponents
+
+
+def regressions(design, results, baseline, tolerance):
+    found = []
+    old = baseline.get(design)
+    if old is None:
+        return found
+    for size, run in results['runs'].items():
+        before = old['runs'].get(size)
+        if before is None:
+            continue
+        per_line = run['seconds'] / run['calibration'] / run['lines']
+        if per_line > tolerance * before['seconds'] / before['calibration'] / before['lines']:
+            found.append(f"{design} {size}: {before['lines_per_second']:.0f} -> {run['lines_per_second']:.0f} lines/s")
+        for name, seconds in run['rules'].items():
+            previous = before['rules'].get(name)
+            if previous is None or seconds < NOISE_SECONDS:
+                continue
+            if seconds / run['seconds'] > tolerance * max(previous, NOISE_SECONDS) / before['seconds']:
+                found.append(f"{design} {size}: {name} {previous * 1000:.1f} -> {seconds * 1000:.1f} ms")
+        if before['peak_rss_kb'] and run['peak_rss_kb'] and run['peak_rss_kb'] > tolerance * before['peak_rss_kb']:
+            found.append(f"{design} {size}: peak RSS {before['peak_rss_kb']} -> {run['peak_rss_kb']} KB")
+    for name, exponent in results['exponents'].items():
+        previous = old['exponents'].get(name)
+        if previous is not None and exponent > previous + EXPONENT_MARGIN:
+            found.append(f"{design}: {name} scaling exponent {previous:.2f} -> {exponent:.2f}")
+    return found
+
+
+def print_design(design, results):
+    print(f"{design}:")
+    for size, run in sorted(results['runs'].items(), key=lambda item: int(item[0])):
+        rss = f"{run['peak_rss_kb'] / 1024:8.1f} MB" if run['peak_rss_kb'] else '       ?'
+        print(f"  {run['lines']:>10} lines {run['seconds']:9.2f} s {run['lines_per_second']:>12.0f} lines/s {rss} peak")
+    slowest = max(results['runs'].values(), key=lambda run: run['lines'])
+    for name, seconds in sorted(slowest['rules'].items(), key=lambda item: item[1], reverse=True):
+        exponent = results['exponents'].get(name)
+        exponent = f"n^{exponent:.2f}" if exponent is not None else '(below noise floor)'
+        print(f"    {name:<40} {seconds * 1000:10.1f} ms {exponent}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--designs', default=','.join(DESIGNS))
+    parser.add_argument('--sizes', default='20000,80000')
+    parser.add_argument('--stream', action='store_true')
+    parser.add_argument('--repeat', type=int, default=5, help='lint each design this many times, keep the fastest')
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help='allowed slowdown factor per line and per MB before a run fails')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--keep', metavar='DIR', help='write the generated designs here and reuse them')
+    parser.add_argument('--measure', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.stream, args.repeat)
+        return 0
+
+    designs = args.designs.split(',')
+    unknown = [design for design in designs if design not in DESIGNS]
+    if unknown:
+        parser.error(f"unknown designs: {', '.join(unknown)} (available: {', '.join(DESIGNS)})")
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.keep or scratch
+        os.makedirs(directory, exist_ok=True)
+        for design in designs:
+            runs = {str(size): run_design(directory, design, size, args.stream, args.repeat) for size in sizes}
+            key = f'{design} (stream)' if args.stream else design
+            report[key] = {'runs': runs, 'exponents': scaling_exponents(runs)}
+            print_design(key, report[key])
+
+    if args.save_baseline:
+        baseline.update(report)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    found = [line for key, results in report.items() for line in regressions(key, results, baseline, args.tolerance)]
+    for line in found:
+        print(f"REGRESSION {line}")
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,526 +1,3498 @@
+import argparse
+import glob
+import heapq
+import io
+import json
+import os
 import re
+import sys
+import time
+from array import array
+from bisect import bisect_right
 from datetime import datetime
-from collections import defaultdict
-import tkinter as tk
-from tkinter import filedialog
+from collections import OrderedDict, defaultdict, deque
+from functools import partial
+
+# hashlib, mmap, sqlite3, concurrent.futures, socket, socketserver, subprocess,
+# threading and tkinter are imported where they are used: importing this module
+# must stay cheap and free of side effects, since the CLI is started once per
+# file in many pipelines and the GUI toolkit is not available on headless
+# machines.
+
+# Compiled once at import and shared by every rule. LINE_PATTERNS are the
+# per-line scans several checks need: SourceIndex runs each of them at most
+# once per line (skipping lines without the literal that every match must
+# contain) and hands all checks the same match table.
+PATTERNS = {
+    'token': re.compile(
+        r"(?P<comment>//.*|/\*.*?(?:\*/|$))"
+        r'|(?P<string>"(?:\\.|[^"\\])*")'
+        r"|(?P<number>\d*\s*'[sS]?[bBoOdDhH]\s*[0-9a-fA-FxXzZ?_]+|\d+)"
+        r"|(?P<identifier>[a-zA-Z_][\w$]*)"
+        r"|(?P<operator><=|>=|==|!=|\S)"
+    ),
+    'overflow': re.compile(r'(\w+)\s*([+\-*/])\s*(\w+)\b'),
+    'if': re.compile(r'\bif\b'),
+    'if_condition': re.compile(r'\bif\s*\([^)]+\)'),
+    'literal': re.compile(r"(\d*)\s*'[sS]?([bBoOdDhH])\s*([0-9a-fA-FxXzZ?_]+)"),
+    'identifier': re.compile(r'[a-zA-Z_]\w*'),
+    'directive': re.compile(r'`(\w+)[ \t]*(.*)'),
+    'define': re.compile(r'`define\s+(\w+)(\([^)]*\))?[ \t]*(.*)'),
+    'include': re.compile(r'`include\s*["<]([^">]+)[">]'),
+    'include_name': re.compile(rb'`include\s*["<]([^">]+)[">]'),
+    'macro_use': re.compile(r'`(\w+)'),
+    'separator': re.compile(r'[,\s]+'),
+}
+LINE_PATTERNS = {
+    'assignment': (re.compile(r'(\w+)\s*=\s*([^;]+)'), '='),
+    'array_access': (re.compile(r'(\w+)\[(\w+)\]'), '['),
+}
+# The same scans over the bytes of a SourceBuffer.
+BYTE_PATTERNS = {
+    'token': re.compile(PATTERNS['token'].pattern.encode()),
+    'newline': re.compile(rb'\n'),
+    'macro_use': re.compile(rb'`(\w+)'),
+}
+BYTE_LINE_PATTERNS = {name: (re.compile(pattern.pattern.encode()), literal.encode())
+                      for name, (pattern, literal) in LINE_PATTERNS.items()}
+# Analyses a SourceIndex can build and what each one is built from. 'tokens',
+# 'declarations', 'blocks' and 'modules' are the index passes, 'case_items'
+# the parsed case item labels, 'dataflow' the signal driver/load graph, and
+# the rest are the match tables of LINE_PATTERNS.
+ANALYSIS_DEPENDENCIES = {
+    'tokens': (),
+    'declarations': ('tokens',),
+    'blocks': ('tokens',),
+    'case_items': ('blocks',),
+    'dataflow': ('blocks',),
+    'modules': ('tokens',),
+    **{name: () for name in LINE_PATTERNS},
+}
+DECLARATION_KEYWORDS = {'input', 'output', 'inout', 'reg', 'wire', 'integer', 'signed'}
+CASE_KEYWORDS = {'case', 'casez', 'casex'}
+PROCESS_KEYWORDS = {'always', 'initial'}
+PORT_KINDS = ('input', 'output', 'inout')
+# Words that can start a module item; an identifier pair 'a b (' is taken for a
+# module instance only when neither word is one of these.
+ITEM_KEYWORDS = DECLARATION_KEYWORDS | CASE_KEYWORDS | PROCESS_KEYWORDS | {
+    'module', 'macromodule', 'endmodule', 'assign', 'parameter', 'localparam', 'defparam', 'function', 'task',
+    'endfunction', 'endtask', 'generate', 'endgenerate', 'genvar', 'for', 'if', 'else', 'begin', 'end', 'real',
+    'time', 'event', 'tri', 'supply0', 'supply1', 'wand', 'wor', 'automatic', 'specify', 'endspecify',
+}
+
+
+DEFINED_KINDS = frozenset({'reg', 'wire', 'output'})
+# Words inside a process that are neither drivers nor loads.
+STATEMENT_KEYWORDS = ITEM_KEYWORDS | {
+    'default', 'endcase', 'posedge', 'negedge', 'or', 'while', 'repeat', 'forever', 'wait', 'disable', 'fork',
+    'join', 'force', 'release', 'assign', 'deassign',
+}
+
+
+# One entry per declared name. A name may be declared more than once
+# ('output q; reg [3:0] q;'); its symbol combines all of them. Netlists
+# declare names by the hundred thousand, so the kinds are shared frozensets
+# and the width and ranges are a shape tuple shared by every name declared
+# alike, None for a plain one-bit name.
+class Symbol:
+    __slots__ = ('name', 'kinds', 'shape', 'line', 'initialized')
+
+    def __init__(self, name, kinds, shape, line, initialized):
+        self.name = name
+        self.kinds = kinds
+        self.shape = shape
+        self.line = line
+        self.initialized = initialized
+
+    @property
+    def width(self):
+        return self.shape[0] if self.shape is not None else 1
+
+    @property
+    def packed(self):
+        return self.shape[1] if self.shape is not None else None
+
+    @property
+    def array(self):
+        return self.shape[2] if self.shape is not None else None
+
+    def state(self):
+        return self.kinds, self.shape, self.initialized
+
+
+# Every distinct set of declaration kinds, as one frozenset.
+KIND_SETS = {}
+
+
+def kind_set(kinds):
+    kinds = frozenset(kinds)
+    return KIND_SETS.setdefault(kinds, kinds)
+
+
+# The signals of one source, keyed by interned name and built during the
+# declaration pass; every rule reads declarations from here.
+class SymbolTable:
+    def __init__(self):
+        self.symbols = {}
+        self.shapes = {}
+
+    def __contains__(self, name):
+        return name in self.symbols
+
+    def get(self, name):
+        return self.symbols.get(name)
+
+    def shape(self, width, packed, array):
+        if width == 1 and not packed and not array:
+            return None
+        shape = (width, packed, array)
+        return self.shapes.setdefault(shape, shape)
+
+    def declare(self, name, kinds, width, packed, array, line, initialized):
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            name = sys.intern(name)
+            symbol = self.symbols[name] = Symbol(name, kind_set(kinds), self.shape(width, packed, array), line,
+                                                 initialized)
+            return symbol
+        if not kinds <= symbol.kinds:
+            symbol.kinds = kind_set(symbol.kinds | kinds)
+        if packed or array:
+            symbol.shape = self.shape(width if packed else symbol.width, packed or symbol.packed,
+                                      array or symbol.array)
+        symbol.initialized = symbol.initialized or initialized
+        return symbol
+
+    def merge(self, symbol):
+        return self.declare(symbol.name, symbol.kinds, symbol.width, symbol.packed, symbol.array, symbol.line,
+                            symbol.initialized)
+
+    def remove(self, name):
+        self.symbols.pop(name, None)
+
+    def width(self, name):
+        symbol = self.symbols.get(name)
+        return symbol.width if symbol is not None else 1
+
+    def is_defined(self, name):
+        symbol = self.symbols.get(name)
+        return symbol is not None and not DEFINED_KINDS.isdisjoint(symbol.kinds)
+
+    def array_bounds(self, name):
+        symbol = self.symbols.get(name)
+        return symbol.array if symbol is not None else None
+
+
+# Driver/load graph of one index, as adjacency lists per signal name.
+# drivers[name] holds (line, process, kind) edges in source order, process
+# being the block id of the always, initial or assign that drives the signal
+# and kind 'blocking', 'nonblocking' or 'continuous'; loads[name] holds
+# (line, process) for every read, in conditions, right-hand sides and
+# indexes alike.
+class SignalGraph:
+    __slots__ = ('drivers', 'loads')
 
-class VerilogLinter:
     def __init__(self):
-        self.errors = defaultdict(list)
-        self.defined_registers = set()
-        self.declarations = {}
+        self.drivers = defaultdict(list)
+        self.loads = defaultdict(list)
+
+    def first_write(self, name):
+        edges = self.drivers.get(name)
+        return edges[0][0] if edges else None
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Case coverage works on cubes: a case label becomes (value, care) over the
+# selector bits, care holding a 1 for each bit the label fixes and value the
+# fixed bits. The z/? digits of a casez label and the x/z/? digits of a casex
+# label are don't-care bits; any other x/z digit never equals a two-state
+# selector and the label covers nothing (None). Fullness and overlap are then
+# decided with cube intersection and subtraction, in time that grows with the
+# number of labels rather than with the 2 ** width selector values, and
+# overlaps are looked up in a CubeIndex rather than against every earlier
+# label.
+CASE_WILDCARDS = {'case': '', 'casez': 'z?', 'casex': 'xz?'}
+LITERAL_DIGIT_BITS = {'b': 1, 'o': 3, 'h': 4}
+
+
+# A number token as (width, cube), width None when unsized; None when the
+# token is not a number.
+def case_literal(value, wildcards):
+    value = value.strip()
+    if value.isdigit():
+        return None, (int(value), -1)
+    match = PATTERNS['literal'].fullmatch(value)
+    if match is None:
+        return None
+    size, base, digits = match.groups()
+    width = int(size) if size else None
+    base = base.lower()
+    digits = digits.replace('_', '').lower()
+    if base == 'd':
+        if digits.isdigit():
+            return width, (int(digits), -1)
+        if digits[0] not in wildcards:
+            return width, None
+        return width, (0, -1 << width if width else 0)
+
+    step = LITERAL_DIGIT_BITS[base]
+    number = care = 0
+    for digit in digits:
+        number <<= step
+        care <<= step
+        if digit in 'xz?':
+            if digit not in wildcards:
+                return width, None
+        else:
+            number |= int(digit, 16)
+            care |= (1 << step) - 1
+    bits = len(digits) * step
+    if width is not None and bits > width:
+        number &= (1 << width) - 1
+        care &= (1 << width) - 1
+        bits = width
+    # Digits missing from the left are zeros, or x/z when the leftmost digit is x/z;
+    # bits beyond the literal's own width are always zeros.
+    if digits[0] not in 'xz?':
+        care |= -1 << bits
+    elif width is not None:
+        care |= -1 << width
+    return width, (number, care)
+
+
+# cube minus other as disjoint cubes.
+def cube_minus(cube, other):
+    value, care = cube
+    other_value, other_care = other
+    if (value ^ other_value) & care & other_care:
+        return [cube]
+    pieces = []
+    free = other_care & ~care
+    while free:
+        bit = free & -free
+        free ^= bit
+        pieces.append((value | (~other_value & bit), care | bit))
+        value |= other_value & bit
+        care |= bit
+    return pieces
+
+
+# Earlier cubes as (position, item, line, cube), grouped by care mask. Two
+# cubes intersect when they agree on the bits both fix, so each group keeps a
+# table per mask it has been asked about, from the entries' bits under that
+# mask to the first entry and the first entry of another item. A lookup then
+# costs one probe per distinct care mask instead of one test per label.
+class CubeIndex:
+    __slots__ = ('groups',)
 
-    def parse_verilog(self, file_path):
-        with open(file_path, 'r') as f:
-            verilog_code = f.readlines()
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, entry):
+        group = self.groups.get(entry[3][1])
+        if group is None:
+            group = self.groups[entry[3][1]] = ([], {})
+        entries, tables = group
+        entries.append(entry)
+        for key, table in tables.items():
+            self.remember(table, entry[3][0] & key, entry)
+
+    # The first entry of an item other than item (of any item when item is
+    # None) whose cube intersects cube.
+    def first_intersecting(self, item, cube):
+        value, care = cube
+        first = None
+        for group_care, (entries, tables) in self.groups.items():
+            key = care & group_care
+            table = tables.get(key)
+            if table is None:
+                table = tables[key] = {}
+                for entry in entries:
+                    self.remember(table, entry[3][0] & key, entry)
+            for entry in table.get(value & key, ()):
+                if entry[1] != item:
+                    if first is None or entry[0] < first[0]:
+                        first = entry
+                    break
+        return first
+
+    @staticmethod
+    def remember(table, bits, entry):
+        found = table.get(bits)
+        if found is None:
+            table[bits] = [entry]
+        elif len(found) == 1 and found[0][1] != entry[1]:
+            found.append(entry)
+
+
+# Width of a case selector: a declared signal, a bit or part select of one, a
+# sized literal or a concatenation of those; None when it cannot be told.
+def selector_width(values, symbols):
+    if len(values) == 1:
+        if is_signal_name(values[0]):
+            symbol = symbols.get(values[0])
+            return symbol.width if symbol is not None else None
+        literal = case_literal(values[0], '')
+        return literal[0] if literal is not None else None
+    if len(values) >= 4 and values[1] == '[' and values[-1] == ']' and is_signal_name(values[0]):
+        select = values[2:-1]
+        if len(select) == 3 and select[1] == ':' and select[0].isdigit() and select[2].isdigit():
+            return abs(int(select[0]) - int(select[2])) + 1
+        return None if ':' in select else 1
+    if values and values[0] == '{' and values[-1] == '}':
+        total = 0
+        for item in split_top_level(values[1:-1]):
+            width = selector_width(item, symbols)
+            if width is None:
+                return None
+            total += width
+        return total
+    return None
+
+
+# What the coverage analysis proved about one case statement: whether its
+# labels (or a default) cover every selector value, the items whose labels
+# overlap an earlier item's as (line, earlier line), and the labels that
+# repeat as (text, lines).
+class CaseCoverage:
+    __slots__ = ('full', 'overlaps', 'duplicates')
+
+    def __init__(self, full, overlaps, duplicates):
+        self.full = full
+        self.overlaps = overlaps
+        self.duplicates = duplicates
+
+
+# items are SourceIndex.case_items; a selector of unknown width is taken to be
+# as wide as the widest sized label, or 32 bits. A label that is not a number
+# (a parameter, an expression) can never prove the case full.
+def cover_case(items, width, wildcards):
+    labels = []
+    constant = True
+    has_default = False
+    for item, (line_number, item_labels) in enumerate(items):
+        if item_labels is None:
+            has_default = True
+            continue
+        for label in item_labels:
+            literal = case_literal(label[0], wildcards) if len(label) == 1 else None
+            if literal is None:
+                constant = False
+            else:
+                labels.append((item, line_number, label[0].strip(), literal))
+    if width is None:
+        width = max((literal[0] for _, _, _, literal in labels if literal[0]), default=32)
+
+    mask = (1 << width) - 1
+    cubes = []
+    repeats = defaultdict(list)
+    for item, line_number, text, (_, cube) in labels:
+        if cube is None or cube[0] & cube[1] & ~mask:
+            continue
+        cube = (cube[0] & cube[1] & mask, cube[1] & mask)
+        cubes.append((item, line_number, cube))
+        repeats[cube].append((text, line_number))
+
+    overlaps = []
+    earlier_cubes = CubeIndex()
+    points = set()
+    for position, (item, line_number, cube) in enumerate(cubes):
+        earlier = earlier_cubes.first_intersecting(item, cube)
+        if earlier is not None:
+            overlaps.append((line_number, earlier[2]))
+        earlier_cubes.add((position, item, line_number, cube))
+        if cube[1] == mask:
+            points.add(cube[0])
+
+    full = has_default
+    if not full and constant and cubes:
+        space = 1 << width
+        if sum(1 << (width - bin(cube[1]).count('1')) for _, _, cube in cubes) >= space:
+            if all(cube[1] == mask for _, _, cube in cubes):
+                full = len(points) == space
+            else:
+                # Each piece of the selector space left is cut by a label that
+                # intersects it; a piece no label intersects is not covered.
+                full = True
+                remaining = [(0, 0)]
+                while remaining:
+                    piece = remaining.pop()
+                    covering = earlier_cubes.first_intersecting(None, piece)
+                    if covering is None:
+                        full = False
+                        break
+                    remaining.extend(cube_minus(piece, covering[3]))
+
+    duplicates = [(found[0][0], [line_number for _, line_number in found])
+                  for found in repeats.values() if len(found) > 1]
+    return CaseCoverage(full, overlaps, duplicates)
+
+
+# Files at least this large are linted from a SourceBuffer.
+MMAP_MIN_BYTES = 1 << 20
+
+
+# The lines of a file as byte ranges of one read-only memory map: nothing is
+# copied or decoded when the file is opened, only the line start offsets are
+# found. Slicing gives a view over the same map and offsets; a line is decoded
+# only when it is read on its own. A SourceIndex built on a buffer runs the
+# byte patterns over the map and decodes just the tokens and match groups it
+# keeps. Lines end at '\n' and keep any '\r' before it.
+class SourceBuffer:
+    def __init__(self, data, line_starts, first=0, last=None):
+        self.data = data
+        self.line_starts = line_starts
+        self.first = first
+        self.last = len(line_starts) - 1 if last is None else last
+
+    @classmethod
+    def open(cls, file_path):
+        import mmap
+        with open(file_path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                data = b''
+        line_starts = array('q', [0])
+        line_starts.extend(match.end() for match in BYTE_PATTERNS['newline'].finditer(data))
+        if line_starts[-1] < len(data):
+            line_starts.append(len(data))
+        return cls(data, line_starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not isinstance(self.data, bytes):
+            self.data.close()
+
+    def __len__(self):
+        return self.last - self.first
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self))
+            return SourceBuffer(self.data, self.line_starts, self.first + start, self.first + max(start, stop))
+        line = range(self.first, self.last)[key]
+        return self.decode(self.line_starts[line], self.line_starts[line + 1])
+
+    def __iter__(self):
+        for line in range(self.first, self.last):
+            yield self.decode(self.line_starts[line], self.line_starts[line + 1])
+
+    # Byte offsets into data of the start of each line and of the end of the
+    # last one.
+    def offsets(self):
+        return self.line_starts[self.first:self.last + 1]
+
+    def decode(self, start, end):
+        return self.data[start:end].decode(errors='replace')
+
+    # Whether the preprocessor would change more than the compiler directive
+    # lines it blanks: the bytes hold an `include, `define, conditional or
+    # macro use.
+    def needs_preprocessing(self):
+        directives = {name.encode() for name in COMPILER_DIRECTIVES}
+        return any(match.group(1) not in directives for match in BYTE_PATTERNS['macro_use'].finditer(self.data))
+
+
+# Everything the checks need from one source file, built in a single pass:
+# the token stream, the declaration table and the always/case/assign blocks.
+# With analyses given (a closed set, see required_analyses) only those are
+# built; by default everything is. tokens, when given, are the already
+# tokenized lines (see split_modules) and replace the tokenize pass.
+# verilog_code is a list of lines or a SourceBuffer; line_offsets are the
+# offsets of the buffer's lines into its map, None for a list of lines.
+class SourceIndex:
+    def __init__(self, verilog_code, first_line=1, symbols=None, analyses=None, tokens=None):
+        self.lines = verilog_code
+        self.buffer = verilog_code if isinstance(verilog_code, SourceBuffer) else None
+        self.first_line = first_line
+        self.last_line = first_line + len(verilog_code) - 1
+        self.line_offsets = self.buffer.offsets() if self.buffer is not None else None
+        self.tokens = []
+        self.line_token_start = [0]
+        self.symbols = SymbolTable() if symbols is None else symbols
+        self.declared_names = {}
+        self.blocks = []
+        self.always_blocks = []
+        self.case_blocks = []
+        self.assign_blocks = []
+        self.modules = []
+        self.case_tables = {}
+        self.case_coverages = {}
+        self.graph = None
+        self.match_tables = {}
+        self.endmodule_line = self.last_line + 1
+
+        if tokens is not None:
+            self.tokens, self.line_token_start = tokens
+        if analyses is None:
+            if tokens is None:
+                self.tokenize()
+            self.index_declarations()
+            self.index_blocks()
+            self.index_modules()
+            return
+
+        if 'tokens' in analyses and tokens is None:
+            self.tokenize()
+        if 'declarations' in analyses:
+            self.index_declarations()
+        if 'blocks' in analyses:
+            self.index_blocks()
+        if 'modules' in analyses:
+            self.index_modules()
+        if 'case_items' in analyses:
+            for block_id in self.case_blocks:
+                self.case_items(block_id)
+        if 'dataflow' in analyses:
+            self.signal_graph()
+        for name in LINE_PATTERNS:
+            if name in analyses:
+                self.line_matches(name)
+
+    # (string, start, end) of each line: the line itself, or its range of the
+    # buffer's map.
+    def line_spans(self):
+        if self.buffer is None:
+            return ((line, 0, len(line)) for line in self.lines)
+        data = self.buffer.data
+        offsets = self.line_offsets
+        return ((data, offsets[line], offsets[line + 1]) for line in range(len(offsets) - 1))
+
+    # Over a buffer, each distinct token is decoded once and its tokens share
+    # the string.
+    def tokenize(self):
+        buffer = self.buffer
+        token_pattern = PATTERNS['token'] if buffer is None else BYTE_PATTERNS['token']
+        comment_open, comment_close = ('/*', '*/') if buffer is None else (b'/*', b'*/')
+        values = {}
+        in_comment = False
+        for line_number, (line, position, end) in enumerate(self.line_spans(), start=self.first_line):
+            if in_comment:
+                close = line.find(comment_close, position, end)
+                if close < 0:
+                    self.line_token_start.append(len(self.tokens))
+                    continue
+                position = close + 2
+                in_comment = False
+
+            for match in token_pattern.finditer(line, position, end):
+                kind = match.lastgroup
+                value = match.group()
+                if kind == 'comment':
+                    in_comment = value.startswith(comment_open) and not value.endswith(comment_close)
+                    continue
+                if buffer is not None:
+                    text = values.get(value)
+                    if text is None:
+                        text = values[value] = value.decode(errors='replace')
+                    value = text
+                self.tokens.append((line_number, kind, value))
+            self.line_token_start.append(len(self.tokens))
+
+    def index_declarations(self):
+        tokens = self.tokens
+        position = 0
+        while position < len(tokens):
+            line_number, kind, value = tokens[position]
+            if kind != 'identifier' or value not in DECLARATION_KEYWORDS:
+                if value == 'endmodule' and self.endmodule_line > self.last_line:
+                    self.endmodule_line = line_number
+                position += 1
+                continue
+
+            kinds = set()
+            while position < len(tokens) and tokens[position][2] in DECLARATION_KEYWORDS:
+                kinds.add(tokens[position][2])
+                position += 1
+            packed, position = self.parse_range(position)
+            width = 32 if 'integer' in kinds else 1
+            if packed:
+                width = abs(packed[0] - packed[1]) + 1
+
+            while position < len(tokens) and tokens[position][1] == 'identifier':
+                name_line, _, name = tokens[position]
+                if name in DECLARATION_KEYWORDS:
+                    break
+                unpacked, position = self.parse_range(position + 1)
+                initialized = position < len(tokens) and tokens[position][2] == '='
+                while position < len(tokens) and tokens[position][2] not in (',', ';', ')'):
+                    position += 1
+
+                self.declared_names[name] = self.symbols.declare(name, kinds, width, packed, unpacked, name_line,
+                                                                 initialized)
+
+                if position >= len(tokens) or tokens[position][2] != ',':
+                    break
+                position += 1
+
+    def parse_range(self, position):
+        tokens = self.tokens
+        if position >= len(tokens) or tokens[position][2] != '[':
+            return None, position
+        end = position + 1
+        while end < len(tokens) and tokens[end][2] != ']':
+            end += 1
+        values = [token[2] for token in tokens[position + 1:end]]
+        if len(values) == 3 and values[1] == ':' and values[0].isdigit() and values[2].isdigit():
+            return (int(values[0]), int(values[2])), end + 1
+        return None, end + 1
+
+    def index_blocks(self):
+        tokens = self.tokens
+        stack = []
+        open_always = None
+        open_assign = None
+
+        for position, (line_number, kind, value) in enumerate(tokens):
+            if kind == 'number' or kind == 'string':
+                continue
+            closed = False
+
+            if value in ('begin', 'fork'):
+                stack.append((value, None))
+            elif value in CASE_KEYWORDS:
+                block_id = self.add_block('case', line_number, position, open_always and open_always[0],
+                                          expr=self.case_expression(position + 1))
+                stack.append(('case', block_id))
+            elif value in ('end', 'join', 'endcase'):
+                opener = 'case' if value == 'endcase' else ('fork' if value == 'join' else 'begin')
+                while stack:
+                    popped, block_id = stack.pop()
+                    if block_id is not None:
+                        self.close_block(block_id, line_number, position)
+                    if popped == opener:
+                        break
+                closed = True
+            elif value == ';':
+                closed = True
+                if open_assign is not None:
+                    self.close_block(open_assign, line_number, position)
+                    open_assign = None
+            elif value in PROCESS_KEYWORDS:
+                if open_always is not None:
+                    self.close_block(open_always[0], tokens[position - 1][0], position - 1)
+                sensitivity, body = self.sensitivity_list(position + 1)
+                block_id = self.add_block(value, line_number, position, None,
+                                          sensitivity=sensitivity, body=body)
+                open_always = (block_id, len(stack))
+            elif value == 'assign' and open_always is None:
+                signal = tokens[position + 1][2] if position + 1 < len(tokens) else ''
+                open_assign = self.add_block('assign', line_number, position, None, signal=signal)
+
+            # A process body is a single statement: it ends once we are back at the
+            # process's own nesting depth and no 'else' continues the statement.
+            if closed and open_always is not None and len(stack) <= open_always[1]:
+                next_value = tokens[position + 1][2] if position + 1 < len(tokens) else None
+                if next_value != 'else':
+                    self.close_block(open_always[0], line_number, position)
+                    open_always = None
+
+        last_line = self.last_line
+        for block in self.blocks:
+            if block['end'] is None:
+                block['end'] = last_line
+                block['last_token'] = len(tokens) - 1
+
+    def add_block(self, kind, line_number, position, parent, **detail):
+        block_id = len(self.blocks)
+        block = {'kind': kind, 'start': line_number, 'end': None, 'parent': parent,
+                 'first_token': position, 'last_token': None}
+        block.update(detail)
+        self.blocks.append(block)
+        if kind == 'always':
+            self.always_blocks.append(block_id)
+        elif kind == 'case':
+            self.case_blocks.append(block_id)
+        elif kind == 'assign':
+            self.assign_blocks.append(block_id)
+        return block_id
+
+    def close_block(self, block_id, line_number, position):
+        block = self.blocks[block_id]
+        block['end'] = line_number
+        block['last_token'] = position
+
+    # One pass over the process and assign tokens. The first '=' or '<=' of a
+    # statement outside parentheses and brackets is its assignment: the names
+    # of its left-hand side, outside index brackets, are driven and every other
+    # name in the statement is read.
+    def signal_graph(self):
+        if self.graph is not None:
+            return self.graph
+        graph = self.graph = SignalGraph()
+        tokens = self.tokens
+        for block_id, block in enumerate(self.blocks):
+            kind = block['kind']
+            if kind == 'case':
+                continue
+            continuous = kind == 'assign'
+            pending = []
+            parens = brackets = braces = 0
+            in_rhs = False
+            for position in range(block.get('body', block['first_token'] + 1), block['last_token'] + 1):
+                line_number, token_kind, value = tokens[position]
+                if token_kind == 'identifier':
+                    if value not in STATEMENT_KEYWORDS and tokens[position - 1][2] != '$':
+                        pending.append((value, line_number, brackets > 0))
+                    elif value in ('begin', 'end', 'else', 'fork', 'join', 'endcase', 'default'):
+                        self.flush_loads(graph, pending, block_id)
+                        in_rhs = False
+                    continue
+                if value == '(':
+                    parens += 1
+                elif value == ')':
+                    parens -= 1
+                    if parens == 0 and not in_rhs:
+                        self.flush_loads(graph, pending, block_id)
+                elif value == '[':
+                    brackets += 1
+                elif value == ']':
+                    brackets -= 1
+                elif value == '{':
+                    braces += 1
+                elif value == '}':
+                    braces -= 1
+                elif parens or brackets or braces:
+                    continue
+                elif value in ('=', '<=') and not in_rhs:
+                    kind = 'continuous' if continuous else ('blocking' if value == '=' else 'nonblocking')
+                    for name, target_line, indexed in pending:
+                        if indexed:
+                            graph.loads[name].append((target_line, block_id))
+                        else:
+                            graph.drivers[name].append((target_line, block_id, kind))
+                    pending.clear()
+                    in_rhs = True
+                elif value == ';' or (value == ',' and continuous):
+                    self.flush_loads(graph, pending, block_id)
+                    in_rhs = False
+                elif value == ':' and not in_rhs:
+                    self.flush_loads(graph, pending, block_id)
+            self.flush_loads(graph, pending, block_id)
+        return graph
+
+    @staticmethod
+    def flush_loads(graph, pending, block_id):
+        for name, line_number, _ in pending:
+            graph.loads[name].append((line_number, block_id))
+        pending.clear()
+
+    # Modules with their header ports (in order) and the instances they contain,
+    # each with its connections as (port name or position, signal names).
+    def index_modules(self):
+        tokens = self.tokens
+        module = None
+        position = 0
+        while position < len(tokens):
+            line_number, kind, value = tokens[position]
+            if kind != 'identifier':
+                position += 1
+            elif value in ('module', 'macromodule') and position + 1 < len(tokens):
+                module = {'name': tokens[position + 1][2], 'start': line_number, 'end': None,
+                          'ports': [], 'instances': []}
+                self.modules.append(module)
+                position = self.module_header(module, position + 2)
+            elif value == 'endmodule':
+                if module is not None:
+                    module['end'] = line_number
+                    module = None
+                position += 1
+            elif module is not None and value not in ITEM_KEYWORDS:
+                position = self.module_instances(module, position)
+            else:
+                position += 1
+        for module in self.modules:
+            if module['end'] is None:
+                module['end'] = self.last_line
+
+    def module_header(self, module, position):
+        tokens = self.tokens
+        if position < len(tokens) and tokens[position][2] == '#':
+            _, position = self.parenthesized(position + 1)
+        values, position = self.parenthesized(position)
+        for item in split_top_level(values):
+            names = [value for value in item if is_signal_name(value)]
+            if names:
+                module['ports'].append(names[-1])
+        return position
+
+    # Reads 'type [#(...)] name [range] (...) [, name (...)] ;' at position;
+    # returns the position after it, or just past the first word if it is not
+    # an instantiation.
+    def module_instances(self, module, position):
+        tokens = self.tokens
+        line_number, _, module_name = tokens[position]
+        cursor = position + 1
+        if cursor < len(tokens) and tokens[cursor][2] == '#':
+            _, cursor = self.parenthesized(cursor + 1)
+        instances = []
+        while cursor < len(tokens) and tokens[cursor][1] == 'identifier' and tokens[cursor][2] not in ITEM_KEYWORDS:
+            instance_name = tokens[cursor][2]
+            _, cursor = self.parse_range(cursor + 1)
+            if cursor >= len(tokens) or tokens[cursor][2] != '(':
+                break
+            values, cursor = self.parenthesized(cursor)
+            instances.append({'module': module_name, 'name': instance_name, 'line': line_number,
+                              'connections': port_connections(values)})
+            if cursor >= len(tokens) or tokens[cursor][2] != ',':
+                break
+            cursor += 1
+        if not instances:
+            return position + 1
+        module['instances'].extend(instances)
+        return cursor
+
+    # One index per module, sharing this index's tokens; each gets its own
+    # symbol table. A module's chunk runs to its 'endmodule' line and takes
+    # the lines before it; lines after the last 'endmodule' join the last
+    # chunk unless they start another module.
+    def split_modules(self, analyses=None):
+        ends = [line_number for line_number, kind, value in self.tokens
+                if value == 'endmodule' and kind == 'identifier']
+        cuts = []
+        for line_number in ends:
+            if not cuts or line_number > cuts[-1]:
+                cuts.append(line_number)
+        if cuts and not any(token[0] > cuts[-1] for token in self.tokens[-1:]):
+            cuts[-1] = self.last_line
+        elif not cuts or cuts[-1] < self.last_line:
+            cuts.append(self.last_line)
+
+        indexes = []
+        first_line = self.first_line
+        line_token_start = self.line_token_start
+        for last_line in cuts:
+            start = first_line - self.first_line
+            end = last_line - self.first_line + 1
+            base = line_token_start[start]
+            tokens = (self.tokens[base:line_token_start[end]],
+                      [offset - base for offset in line_token_start[start:end + 1]])
+            indexes.append(SourceIndex(self.lines[start:end], first_line, None, analyses, tokens))
+            first_line = last_line + 1
+        return indexes
+
+    # The items of a case block as (line, labels) with labels a list of token
+    # value lists, one per comma-separated label; a default item has labels None.
+    def case_items(self, block_id):
+        items = self.case_tables.get(block_id)
+        if items is not None:
+            return items
+        items = self.case_tables[block_id] = []
+        tokens = self.tokens
+        block = self.blocks[block_id]
+        _, position = self.parenthesized(block['first_token'] + 1)
+        end = block['last_token']
+        while position < end:
+            line_number = tokens[position][0]
+            if tokens[position][2] == 'default':
+                position += 1
+                if position < end and tokens[position][2] == ':':
+                    position += 1
+                items.append((line_number, None))
+            else:
+                label = []
+                depth = 0
+                while position < end:
+                    value = tokens[position][2]
+                    if value in ('(', '[', '{'):
+                        depth += 1
+                    elif value in (')', ']', '}'):
+                        depth -= 1
+                    elif value == ':' and depth == 0:
+                        break
+                    label.append(value)
+                    position += 1
+                items.append((line_number, split_top_level(label)))
+                position += 1
+            position = self.skip_statement(position, end)
+        return items
+
+    def case_coverage(self, block_id):
+        coverage = self.case_coverages.get(block_id)
+        if coverage is None:
+            first_token = self.blocks[block_id]['first_token']
+            selector, _ = self.parenthesized(first_token + 1)
+            coverage = self.case_coverages[block_id] = cover_case(
+                self.case_items(block_id), selector_width(selector, self.symbols),
+                CASE_WILDCARDS[self.tokens[first_token][2]])
+        return coverage
+
+    # Returns the position after the statement starting at position.
+    def skip_statement(self, position, end):
+        tokens = self.tokens
+        depth = 0
+        parens = 0
+        while position < end:
+            value = tokens[position][2]
+            position += 1
+            if value == '(':
+                parens += 1
+                continue
+            if value == ')':
+                parens -= 1
+                continue
+            if value in ('begin', 'fork') or value in CASE_KEYWORDS:
+                depth += 1
+                continue
+            if value in ('end', 'join', 'endcase'):
+                depth -= 1
+            elif value != ';' or parens:
+                continue
+            if depth <= 0 and (position >= end or tokens[position][2] != 'else'):
+                return position
+        return position
+
+    def case_expression(self, position):
+        values, position = self.parenthesized(position)
+        return ' '.join(values)
+
+    def sensitivity_list(self, position):
+        tokens = self.tokens
+        if position >= len(tokens) or tokens[position][2] != '@':
+            return None, position
+        position += 1
+        if position < len(tokens) and tokens[position][2] == '(':
+            values, position = self.parenthesized(position)
+            return ' '.join(values), position
+        if position < len(tokens):
+            return tokens[position][2], position + 1
+        return None, position
+
+    def parenthesized(self, position):
+        tokens = self.tokens
+        if position >= len(tokens) or tokens[position][2] != '(':
+            return [], position
+        depth = 0
+        end = position
+        while end < len(tokens):
+            value = tokens[end][2]
+            if value == '(':
+                depth += 1
+            elif value == ')':
+                depth -= 1
+                if depth == 0:
+                    break
+            end += 1
+        return [token[2] for token in tokens[position + 1:end]], end + 1
+
+    def line_matches(self, name, start_line=None, end_line=None):
+        table = self.match_tables.get(name)
+        if table is None:
+            table = self.match_tables[name] = self.build_match_table(name)
+        matches, line_start = table
+        first_line = self.first_line
+        if start_line is None:
+            start_line = first_line
+        if end_line is None:
+            end_line = self.last_line
+        return matches[line_start[start_line - first_line]:line_start[end_line - first_line + 1]]
+
+    def build_match_table(self, name):
+        buffer = self.buffer
+        pattern, literal = LINE_PATTERNS[name] if buffer is None else BYTE_LINE_PATTERNS[name]
+        matches = []
+        line_start = [0]
+        for line_number, (line, start, end) in enumerate(self.line_spans(), start=self.first_line):
+            if line.find(literal, start, end) >= 0:
+                for match in pattern.finditer(line, start, end):
+                    if buffer is None:
+                        matches.append((line_number,) + match.groups())
+                    else:
+                        matches.append((line_number,) + tuple(group.decode(errors='replace')
+                                                             for group in match.groups()))
+            line_start.append(len(matches))
+        return matches, line_start
+
+    def block_tokens(self, block_id):
+        block = self.blocks[block_id]
+        return self.tokens[block.get('body', block['first_token']):block['last_token'] + 1]
+
+    def block_text(self, block_id):
+        block = self.blocks[block_id]
+        first = block['start'] - self.first_line
+        last = block['end'] - self.first_line + 1
+        if self.buffer is None:
+            return ''.join(self.lines[first:last])
+        return self.buffer.decode(self.line_offsets[first], self.line_offsets[last])
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# A finding is a compact record: the rule that produced it, the file and the
+# position, the signal name (interned, so the many findings about one signal
+# share it) and the message arguments. The text is only formatted when a
+# report writer asks for it. FINDING_RULES maps each rule to its report
+# category, message template and the arguments that hold line numbers (an int
+# or a tuple of ints), which move with the finding.
+FINDING_RULES = {
+    'overflow_add': ('Arithmetic Overflow', "Signal '{signal}' may overflow as no enough bitwidth available.", ()),
+    'overflow_sub': ('Arithmetic Overflow', "Signal '{signal}' may overflow. Bitwidth is not enough.", ()),
+    'overflow_mul': ('Arithmetic Overflow', "Signal '{signal}' may cause multiplication overflow.", ()),
+    'overflow_div': ('Arithmetic Overflow', "Signal '{signal}' may cause division overflow.", ()),
+    'undefined_register': ('Undefined Register Usage', "Register '{signal}' is undefined ", ()),
+    'multi_driven': ('Multi-Driven Registers', "Register '{signal}' is assigned in multiple always blocks. "
+                                               "Previous assignment at line {0}.", (0,)),
+    'latch_if': ('Inferred Latches', "Inferred latch found: 'if' statement without an 'else' branch.", ()),
+    'latch_case': ('Inferred Latches', "Inferred latch found: 'case' statement without a default case.", ()),
+    'non_full_case': ('Non Full Cases', "Non Full Case Found: 'case' statement not full.", ()),
+    'non_parallel_case': ('Non Parallel Cases', "Non Parallel Case Found: 'case' statement not parallel.", ()),
+    'duplicate_case_value': ('Duplicate Case Values', "Duplicate case value '{0}' found {1} times on lines {2} "
+                                                      "in case block starting at line {3}.", (2, 3)),
+    'uninitialized_register': ('Uninitialized Register Case', "Uninitialized register '{signal}' used before "
+                                                              "initialization. Lines: {0}.", (0,)),
+    'incomplete_sensitivity': ('Incomplete Sensitivity List', "Incomplete sensitivity list: Missing signals {0} "
+                                                              "in block starting at line {1}.", (1,)),
+    'blocking_in_clocked': ('Blocking assignment errors', "Blocking assignment ('=') to '{signal}' in clocked "
+                                                          "block. Consider using non-blocking ('<=').", ()),
+    'nonblocking_outside_clocked': ('Blocking assignment errors', "Non-blocking assignment ('<=') to '{signal}' "
+                                                                  "outside clocked block. Consider using blocking "
+                                                                  "('=').", ()),
+    'race_condition': ('Race Condition', "Signal '{signal}' assigned on lines {0}", (0,)),
+    'array_out_of_bounds': ('Array Index Out of Bounds', "Array '{signal}' index {0} out of bounds. "
+                                                         "Valid range: [0:{1}].", ()),
+    'array_variable_index': ('Array Index Out of Bounds', "Potential out of bounds access for array '{signal}' "
+                                                          "with variable index '{0}'.", ()),
+    'input_port_driven': ('Port Driven From Both Sides', "Input port '{signal}' of instance '{0}' is connected "
+                                                         "here and also assigned inside module '{1}' at line {2}.",
+                          ()),
+    'output_port_contention': ('Port Driven From Both Sides', "Signal '{signal}' is driven by output port '{0}' of "
+                                                              "instance '{1}' and also at line {2}.", (2,)),
+    'streaming_window_limit': ('Streaming Window Limit', "Statement exceeds the {0}-line streaming window; "
+                                                         "block checks only saw the part that fit.", ()),
+    'include_not_found': ('Preprocessor', "Include file '{0}' not found.", ()),
+    'undefined_macro': ('Preprocessor', "Macro '`{0}' is used but not defined.", ()),
+    'recursive_macro': ('Preprocessor', "Macro '`{0}' is used inside its own expansion and left unexpanded.", ()),
+    'unreadable_file': ('Unreadable File', "File could not be read: {0}.", ()),
+}
+
+
+class Finding:
+    __slots__ = ('rule', 'file', 'line', 'column', 'signal', 'args')
+
+    def __init__(self, rule, line, signal=None, args=(), file=None, column=None):
+        self.rule = rule
+        self.file = file
+        self.line = line
+        self.column = column
+        self.signal = sys.intern(signal) if signal is not None else None
+        self.args = args
+
+    @property
+    def category(self):
+        return FINDING_RULES[self.rule][0]
+
+    @property
+    def message(self):
+        template = FINDING_RULES[self.rule][1]
+        return template.format(*(', '.join(map(str, arg)) if isinstance(arg, tuple) else arg for arg in self.args),
+                               signal=self.signal)
+
+    def shifted(self, offset):
+        return Finding(self.rule, self.line + offset, self.signal, shifted_args(self.rule, self.args, offset),
+                       self.file, self.column)
+
+    # JSON-safe form for the result cache. The file is only stored when it is
+    # not file, the one that was linted (a finding inside an included header).
+    def to_row(self, file=None):
+        row = [self.rule, self.line, self.column, self.signal, self.args]
+        if self.file is not None and self.file != file:
+            row.append(self.file)
+        return row
+
+    @classmethod
+    def from_row(cls, row, file=None):
+        rule, line, column, signal, args, *origin = row
+        return cls(rule, line, signal, tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args),
+                   origin[0] if origin else file, column)
+
+    def __eq__(self, other):
+        return isinstance(other, Finding) and all(getattr(self, name) == getattr(other, name)
+                                                  for name in Finding.__slots__)
+
+    def __hash__(self):
+        return hash((self.rule, self.file, self.line, self.column, self.signal, self.args))
+
+    def __repr__(self):
+        return f"Finding({self.rule!r}, {self.line!r}, {self.signal!r}, {self.args!r})"
+
+
+# The arguments of a rule's finding with the line numbers among them moved by
+# offset.
+def shifted_args(rule, args, offset):
+    line_args = FINDING_RULES[rule][2]
+    if not line_args or not offset:
+        return args
+    return tuple((tuple(number + offset for number in arg) if isinstance(arg, tuple) else arg + offset)
+                 if position in line_args else arg for position, arg in enumerate(args))
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Preprocessor run ahead of the checks: `include, `define/`undef with and
+# without arguments, `ifdef/`ifndef/`elsif/`else/`endif for the given define
+# set, and the other compiler directives blanked. Directive lines become empty
+# lines and a macro use expands in place, so a file without includes keeps its
+# line numbers; included lines are spliced in and the SourceMap takes every
+# output line back to its file and line. A macro used inside its own
+# expansion is left as it is, so `define A `A `A cannot expand without end.
+COMPILER_DIRECTIVES = {
+    'timescale', 'default_nettype', 'resetall', 'celldefine', 'endcelldefine', 'unconnected_drive',
+    'nounconnected_drive', 'pragma', 'line', 'begin_keywords', 'end_keywords', 'undefineall',
+}
+CONDITIONAL_DIRECTIVES = {'ifdef', 'ifndef', 'elsif', 'else', 'endif'}
+MAX_MACRO_DEPTH = 32
+
+
+# A mapping that keeps its max_entries most recently used items. The lint
+# server's threads share one; a lookup that races an eviction just misses.
+class LRUCache:
+    def __init__(self, max_entries):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        try:
+            self.entries.move_to_end(key)
+        except KeyError:
+            return None
+        return self.entries.get(key)
+
+    def put(self, key, value):
+        self.entries[key] = value
+        while len(self.entries) > self.max_entries:
+            try:
+                self.entries.popitem(last=False)
+            except KeyError:
+                break
+        return value
 
-        self.check_arithmetic_overflow(verilog_code)
-        self.check_undefined_registers(verilog_code)
-        self.check_multi_driven_registers(verilog_code)
-        self.check_inferred_latches(verilog_code)
-        self.check_full_or_parallel_case(verilog_code)
-        self.check_duplicate_case_values(verilog_code)
-        self.check_uninitialized_registers(verilog_code)
-        self.check_incomplete_sensitivity_list(verilog_code)
-        self.check_blocking_nonblocking_assignments(verilog_code)
-        self.check_potential_race_conditions(verilog_code)
-        self.check_array_index_out_of_bounds(verilog_code)
 
-    # ---------------------------------------------------------------------------------------------------------------------------------------
-    def check_arithmetic_overflow(self, verilog_code):
-        variable_bits = {}
-        overflow_pattern = r'\b(\w+)\s*=\s*(\w+)\s*([+\-*/])\s*(\w+)\b'
-
-        for line in verilog_code:
-            matches = re.findall(r'\b(input|output|reg|output\s*reg|wire)\s*(\[\d+:\d+\])?\s*(\w+)\b', line)
-            for match in matches:
-                variable_name = match[2]
-                variable_bit = match[1]
-
-                if variable_bit:
-                    num1, num2 = map(int, re.findall(r'\d+', variable_bit))
-                    variable_bits[variable_name] = abs(num1 - num2) + 1
-                else:
-                    variable_bits[variable_name] = 1  # Default 1-bit for undeclared widths
-
-        for line_number, operation in enumerate(verilog_code, start=1):
-            matches = re.findall(overflow_pattern, operation)
-            for match in matches:
-                signal = match[0]
-                op1 = match[1]
-                operator = match[2]
-                op2 = match[3]
-
-                def get_bitwidth(value):
-                    return variable_bits.get(value, 1) if not value.isnumeric() else 1
-
-                op1_bits = get_bitwidth(op1)
-                op2_bits = get_bitwidth(op2)
-                signal_bits = get_bitwidth(signal)
-
-                if operator == '+' and signal_bits <= max(op1_bits, op2_bits):
-                    self.errors['Arithmetic Overflow'].append(
-                        (line_number, f"Signal '{signal}' may overflow as no enough bitwidth available.")
-                    )
-                elif operator == '-' and signal_bits < max(op1_bits, op2_bits):
-                    self.errors['Arithmetic Overflow'].append(
-                        (line_number, f"Signal '{signal}' may overflow. Bitwidth is not enough.")
-                    )
-                elif operator == '*':
-                    if signal_bits < op1_bits + op2_bits:
-                        self.errors['Arithmetic Overflow'].append(
-                            (line_number, f"Signal '{signal}' may cause multiplication overflow.")
-                        )
-                elif operator == '/' and signal_bits < op1_bits:
-                    self.errors['Arithmetic Overflow'].append(
-                        (line_number, f"Signal '{signal}' may cause division overflow.")
-                    )
+# Expanded headers by (path, mtime, macros in effect when included), shared by
+# every file a process preprocesses: a header that 2,000 files include with the
+# same defines is read and expanded once per worker.
+HEADER_CACHE = LRUCache(256)
+# The `include names of a file by (path, mtime), for result cache keys.
+INCLUDE_NAMES_CACHE = LRUCache(4096)
 
-    # ---------------------------------------------------------------------------------------------------------------------------------------
-    def check_undefined_registers(self, verilog_code):
-        declaration_pattern = r'\b(?:reg|wire|output)\s*([^;]+)\b'
-        for line_number, line in enumerate(verilog_code,
-                                           start=1):
-            matches = re.findall(declaration_pattern, line)
-            for match in matches:
-                signal_names = re.findall(r'\b(\w+)\b', match)
-                for signal in signal_names:
-                    self.defined_registers.add(signal)
-
-        usage_pattern = r'\b(\w+)\s*=\s*([^;]+)\b'
-        for line_number, line in enumerate(verilog_code, start=1):
-            matches = re.findall(usage_pattern, line)
-            for match in matches:
-                signal = match[0]
-
-                if signal not in self.defined_registers:
-                    self.errors['Undefined Register Usage'].append((line_number, f"Register '{signal}' is undefined "))
 
-    # ---------------------------------------------------------------------------------------------------------------------------------------
-    def check_multi_driven_registers(self, verilog_code):
-        register_assignments = {}
+# Output line runs: starts[i] is the first output line of run i, which maps
+# line for line onto origins[i] = (file, first line).
+class SourceMap:
+    __slots__ = ('starts', 'origins')
 
-        for line_number, line in enumerate(verilog_code, start=1):
-            if re.search(r'\balways\s*@', line):
-                always_block = self.extract_always_block(verilog_code, line_number)
-                assignments = self.extract_register_assignments(always_block, line_number)
+    def __init__(self):
+        self.starts = []
+        self.origins = []
+
+    def add(self, output_line, file, line):
+        if self.origins:
+            start = self.starts[-1]
+            last_file, first = self.origins[-1]
+            if last_file == file and first + output_line - start == line:
+                return
+        self.starts.append(output_line)
+        self.origins.append((file, line))
+
+    def extend(self, other, offset):
+        for start, (file, line) in zip(other.starts, other.origins):
+            self.add(start + offset, file, line)
+
+    def locate(self, output_line):
+        run = max(bisect_right(self.starts, output_line) - 1, 0)
+        file, first = self.origins[run]
+        return file, first + output_line - self.starts[run]
+
+
+# include_dirs are searched after the including file's directory; defines maps
+# a name to its replacement text, as -D NAME[=VALUE] gives them.
+class Preprocessor:
+    def __init__(self, include_dirs=(), defines=None):
+        self.include_dirs = tuple(include_dirs)
+        self.defines = dict(defines or {})
+
+    # Returns (lines, source_map, problems); problems are (output line, rule,
+    # args) for the linter to report. source_map is None when the file has no
+    # directives and the lines are returned as they are.
+    def preprocess(self, file_path, lines):
+        if not self.defines and not any('`' in line for line in lines):
+            return lines, None, []
+        macros = {name: (None, value) for name, value in self.defines.items()}
+        output = []
+        source_map = SourceMap()
+        problems = []
+        self.expand(file_path, lines, macros, output, source_map, problems, (os.path.abspath(file_path),))
+        return output, source_map, problems
+
+    def expand(self, file_path, lines, macros, output, source_map, problems, stack):
+        conditions = []
+        active = True
+        number = 0
+        while number < len(lines):
+            line = lines[number]
+            number += 1
+            source_map.add(len(output) + 1, file_path, number)
+            stripped = line.lstrip()
+            match = PATTERNS['directive'].match(stripped) if stripped.startswith('`') else None
+            directive = match.group(1) if match else None
+
+            if directive in CONDITIONAL_DIRECTIVES:
+                active = self.conditional(directive, match.group(2).split(), macros, conditions, active)
+                output.append("\n")
+            elif not active:
+                output.append("\n")
+            elif directive == 'define':
+                first = number
+                text = line
+                while text.rstrip().endswith('\\') and number < len(lines):
+                    text = text.rstrip()[:-1] + ' ' + lines[number]
+                    number += 1
+                self.define(PATTERNS['define'].match(text.lstrip()), macros)
+                output.extend("\n" for _ in range(number - first + 1))
+            elif directive == 'undef':
+                macros.pop(match.group(2).strip(), None)
+                output.append("\n")
+            elif directive == 'include':
+                output.append("\n")
+                include = PATTERNS['include'].match(stripped)
+                path = include and self.resolve(include.group(1), file_path)
+                if path is None:
+                    name = include.group(1) if include else match.group(2).strip()
+                    problems.append((len(output), 'include_not_found', (name,)))
+                elif path not in stack:
+                    # A header including itself again is skipped, as its guard would.
+                    self.include(path, macros, output, source_map, problems, stack)
+            elif directive in COMPILER_DIRECTIVES:
+                output.append("\n")
+            else:
+                output.append(self.expand_macros(line, macros, problems, len(output) + 1))
+
+    @staticmethod
+    def conditional(directive, words, macros, conditions, active):
+        if directive in ('ifdef', 'ifndef'):
+            taken = bool(words) and (words[0] in macros) == (directive == 'ifdef')
+            conditions.append([active, taken])
+            return active and taken
+        if not conditions:
+            return active
+        parent, taken = conditions[-1]
+        if directive == 'endif':
+            conditions.pop()
+            return parent
+        branch = not taken and (directive == 'else' or (bool(words) and words[0] in macros))
+        conditions[-1][1] = taken or branch
+        return parent and branch
+
+    @staticmethod
+    def define(match, macros):
+        if match is None:
+            return
+        name, parameters, body = match.groups()
+        body = body.split('//', 1)[0].strip()
+        if parameters is not None:
+            parameters = tuple(parameter.split('=', 1)[0].strip() for parameter in parameters[1:-1].split(','))
+        macros[name] = (parameters, body)
+
+    def resolve(self, name, file_path):
+        for directory in (os.path.dirname(os.path.abspath(file_path)),) + self.include_dirs:
+            path = os.path.abspath(os.path.join(directory, name))
+            if os.path.isfile(path):
+                return path
+        return None
 
-                for assignment in assignments:
-                    register_name = assignment[0]
-                    register_line_number = assignment[1]
+    def include(self, path, macros, output, source_map, problems, stack):
+        key = (path, os.stat(path).st_mtime_ns, frozenset(macros.items()))
+        cached = HEADER_CACHE.get(key)
+        if cached is None:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                header_lines = f.readlines()
+            header_macros = dict(macros)
+            header_output = []
+            header_map = SourceMap()
+            header_problems = []
+            self.expand(path, header_lines, header_macros, header_output, header_map, header_problems,
+                        stack + (path,))
+            cached = HEADER_CACHE.put(key, (header_output, header_map, header_macros, header_problems))
+        header_output, header_map, header_macros, header_problems = cached
+        offset = len(output)
+        source_map.extend(header_map, offset)
+        problems.extend((line + offset, rule, args) for line, rule, args in header_problems)
+        output.extend(header_output)
+        macros.clear()
+        macros.update(header_macros)
+
+    # expanding holds the macros whose bodies line comes from.
+    def expand_macros(self, line, macros, problems, output_line, expanding=frozenset()):
+        code, comment = line, ''
+        if '//' in line:
+            position = line.index('//')
+            code, comment = line[:position], line[position:]
+        if '`' not in code:
+            return line
+        pieces = []
+        position = 0
+        for match in PATTERNS['macro_use'].finditer(code):
+            if match.start() < position:
+                continue
+            name = match.group(1)
+            pieces.append(code[position:match.start()])
+            position = match.end()
+            if name not in macros:
+                if name not in COMPILER_DIRECTIVES and name not in CONDITIONAL_DIRECTIVES:
+                    problems.append((output_line, 'undefined_macro', (name,)))
+                pieces.append(match.group(0))
+                continue
+            parameters, body = macros[name]
+            if parameters is not None:
+                arguments, position = self.macro_arguments(code, position)
+                for parameter, argument in zip(parameters, arguments):
+                    body = re.sub(rf'\b{re.escape(parameter)}\b', lambda _, argument=argument: argument, body)
+            if name in expanding:
+                problem = (output_line, 'recursive_macro', (name,))
+                if not problems or problems[-1] != problem:
+                    problems.append(problem)
+                pieces.append(code[match.start():position])
+                continue
+            if len(expanding) < MAX_MACRO_DEPTH:
+                body = self.expand_macros(body, macros, problems, output_line, expanding | {name})
+            pieces.append(body)
+        pieces.append(code[position:])
+        return ''.join(pieces) + comment
+
+    @staticmethod
+    def macro_arguments(code, position):
+        start = position
+        while start < len(code) and code[start] in ' \t':
+            start += 1
+        if start >= len(code) or code[start] != '(':
+            return [], position
+        arguments = ['']
+        depth = 0
+        for end in range(start, len(code)):
+            character = code[end]
+            if character in '([{':
+                depth += 1
+                if depth == 1:
+                    continue
+            elif character in ')]}':
+                depth -= 1
+                if depth == 0:
+                    return [argument.strip() for argument in arguments], end + 1
+            elif character == ',' and depth == 1:
+                arguments.append('')
+                continue
+            arguments[-1] += character
+        return [argument.strip() for argument in arguments], len(code)
+
+    # What a cached result of file_path depends on besides its own bytes: the
+    # define set, the include path and the (path, mtime, size) of every header
+    # it may include, whichever `ifdef branch the include sits in.
+    def dependency_key(self, file_path, content):
+        parts = [repr(sorted(self.defines.items())), repr(self.include_dirs)]
+        seen = set()
+        pending = [(file_path, self.include_names(content))]
+        while pending:
+            including, names = pending.pop()
+            for name in names:
+                path = self.resolve(name, including)
+                if path is None or path in seen:
+                    continue
+                seen.add(path)
+                stat = os.stat(path)
+                parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+                key = (path, stat.st_mtime_ns)
+                header_names = INCLUDE_NAMES_CACHE.get(key)
+                if header_names is None:
+                    with open(path, 'rb') as f:
+                        header_names = INCLUDE_NAMES_CACHE.put(key, self.include_names(f.read()))
+                pending.append((path, header_names))
+        return '\0'.join(parts).encode()
+
+    @staticmethod
+    def include_names(content):
+        return [match.group(1).decode() for match in PATTERNS['include_name'].finditer(content)]
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+class VerilogLinter:
+    # Rule registry: every check, in run order, with the analyses it reads.
+    # Only the analyses of the enabled checks are built, each once per file.
+    RULES = {
+        'check_arithmetic_overflow': ('declarations', 'assignment'),
+        'check_undefined_registers': ('declarations', 'assignment'),
+        'check_multi_driven_registers': ('dataflow',),
+        'check_inferred_latches': ('blocks', 'declarations', 'case_items'),
+        'check_full_or_parallel_case': ('declarations', 'case_items'),
+        'check_duplicate_case_values': ('declarations', 'case_items'),
+        'check_uninitialized_registers': ('declarations', 'dataflow'),
+        'check_incomplete_sensitivity_list': ('blocks',),
+        'check_blocking_nonblocking_assignments': ('dataflow',),
+        'check_potential_race_conditions': ('dataflow',),
+        'check_array_index_out_of_bounds': ('declarations', 'array_access'),
+    }
+    CHECKS = tuple(RULES)
+
+    def __init__(self, checks=None, profile=False, preprocessor=None):
+        self.errors = defaultdict(list)
+        self.symbols = SymbolTable()
+        self.checks = self.CHECKS if checks is None else schedule_checks(checks)
+        self.analyses = required_analyses(self.checks)
+        self.stats = LintStats() if profile else None
+        self.preprocessor = preprocessor
+        self.file = None
+
+    # Each module is analysed on its own: its own index, symbol table and
+    # cross-block tables, so declarations and drivers never leak between the
+    # modules of one file. Large files are read through a SourceBuffer unless
+    # they use `include, `define, conditionals or macros, which the
+    # preprocessor expands on lines; compiler directives such as `timescale
+    # are linted in place, as with --no-preprocess.
+    def parse_verilog(self, file_path):
+        if os.path.getsize(file_path) >= MMAP_MIN_BYTES:
+            with SourceBuffer.open(file_path) as source:
+                if self.preprocessor is None or not source.needs_preprocessing():
+                    self.parse_lines(file_path, source)
+                    return
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            verilog_code = f.readlines()
+        if self.preprocessor is None:
+            self.parse_lines(file_path, verilog_code)
+            return
+
+        start = time.perf_counter() if self.stats is not None else None
+        verilog_code, source_map, problems = self.preprocessor.preprocess(file_path, verilog_code)
+        if start is not None:
+            self.stats.add('Preprocessor', time.perf_counter() - start, lines=len(verilog_code))
+        self.parse_lines(file_path, verilog_code)
+        for line_number, rule, args in problems:
+            self.add_finding(rule, line_number, None, *args)
+        if source_map is not None:
+            self.map_findings(source_map)
+
+    # Moves findings from preprocessed lines back to the file and line they
+    # came from.
+    def map_findings(self, source_map):
+        for findings in self.errors.values():
+            for finding in findings:
+                file, finding.line = source_map.locate(finding.line)
+                finding.file = sys.intern(file)
+                line_args = FINDING_RULES[finding.rule][2]
+                if line_args:
+                    finding.args = tuple(
+                        (tuple(source_map.locate(number)[1] for number in arg) if isinstance(arg, tuple)
+                         else source_map.locate(arg)[1]) if position in line_args else arg
+                        for position, arg in enumerate(finding.args))
+
+    def parse_lines(self, file_path, verilog_code):
+        self.file = sys.intern(file_path)
+        for index in self.module_indexes(verilog_code):
+            self.symbols = index.symbols
+            for check in self.checks:
+                self.run_check(check, index)
+
+    # The file is tokenized once and cut into per-module indexes. Checks that
+    # need no tokens see the whole file as one index.
+    def module_indexes(self, verilog_code):
+        start = time.perf_counter() if self.stats is not None else None
+        if 'tokens' in self.analyses:
+            indexes = SourceIndex(verilog_code, analyses=('tokens',)).split_modules(self.analyses)
+        else:
+            indexes = [SourceIndex(verilog_code, analyses=self.analyses)]
+        if start is not None:
+            self.stats.add('SourceIndex', time.perf_counter() - start, lines=len(verilog_code))
+        return indexes
+
+    def build_index(self, verilog_code, first_line=1, symbols=None):
+        if self.stats is None:
+            return SourceIndex(verilog_code, first_line, symbols, self.analyses)
+        start = time.perf_counter()
+        index = SourceIndex(verilog_code, first_line, symbols, self.analyses)
+        self.stats.add('SourceIndex', time.perf_counter() - start, lines=len(verilog_code))
+        return index
+
+    def run_check(self, check, index, **state):
+        if self.stats is None:
+            getattr(self, check)(index, **state)
+            return
+        profiled = ProfiledIndex(index)
+        self.stats.measure(check, self.errors, partial(getattr(self, check), profiled, **state),
+                           lines=len(index.lines), index=profiled)
+
+    # Cross-block rules in streaming mode report once at the end of each
+    # module; the time and findings are charged to the rule itself.
+    def run_report(self, check, report, table):
+        if self.stats is None:
+            report(table)
+            return
+        self.stats.measure(check, self.errors, partial(report, table))
 
-                    if register_name not in register_assignments:
-                        register_assignments[register_name] = register_line_number
-                    else:
-                        previous_line_number = register_assignments[register_name]
-                        if previous_line_number != register_line_number:
-                            self.errors['Multi-Driven Registers'].append(
-                                (register_line_number,
-                                 f"Register '{register_name}' is assigned in multiple always blocks. "
-                                 f"Previous assignment at line {previous_line_number}.")
-                            )
-    def extract_always_block(self, verilog_code, line_number):
-        always_block = []
-        for line in verilog_code[line_number - 1:]:
-            if re.search(r'\bend\b', line):
-                always_block.append(line)
-                break
-            always_block.append(line)
+    # ---------------------------------------------------------------------------------------------------------------------------------------
+    # Streaming mode for inputs too large to hold in memory. The file is read
+    # line by line and cut into windows of whole top-level statements, and each
+    # window is indexed on its own against the declarations seen so far. The
+    # line-local rules run as generators over each window's match tables, the
+    # block rules see only the window holding the current block, and the
+    # cross-block rules carry their per-signal tables from window to window.
+    # Windows are also cut after every 'endmodule'; the symbol table and the
+    # cross-block tables start over with each module.
+    def parse_verilog_stream(self, file_path, window_lines=4096, max_window_lines=65536):
+        state = self.cross_block_state()
+        self.file = sys.intern(file_path)
+        self.symbols = SymbolTable()
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for first_line, window, complete in self.stream_windows(f, window_lines, max_window_lines,
+                                                                    split_modules=True):
+                index = self.build_index(window, first_line, self.symbols)
+                for check in self.checks:
+                    self.run_check(check, index, **state.get(check, {}))
+                if not complete:
+                    self.add_finding('streaming_window_limit', first_line + len(window) - 1, None, max_window_lines)
+                if index.endmodule_line <= index.last_line:
+                    self.report_cross_block_state(state)
+                    state = self.cross_block_state()
+                    self.symbols = SymbolTable()
+
+        self.report_cross_block_state(state)
+
+    @staticmethod
+    def cross_block_state():
+        return {
+            'check_multi_driven_registers': {'register_assignments': {}},
+            'check_potential_race_conditions': {'signal_assignments': {}},
+            'check_uninitialized_registers': {'first_writes': {}, 'signal_reads': defaultdict(list)},
+        }
+
+    def report_cross_block_state(self, state):
+        if 'check_potential_race_conditions' in self.checks:
+            self.run_report('check_potential_race_conditions', self.report_race_conditions,
+                            state['check_potential_race_conditions']['signal_assignments'])
+        if 'check_uninitialized_registers' in self.checks:
+            self.run_report('check_uninitialized_registers',
+                            partial(self.report_uninitialized_registers,
+                                    first_writes=state['check_uninitialized_registers']['first_writes']),
+                            state['check_uninitialized_registers']['signal_reads'])
+
+    # Yields (first line number, lines, cut at a statement boundary) windows of
+    # at least window_lines lines, cut only where no block or process is open
+    # unless the window reaches max_window_lines. Stops early at the first
+    # boundary that falls on a line number in stop_at. With split_modules, a
+    # window also ends with every line holding an 'endmodule'.
+    def stream_windows(self, lines, window_lines, max_window_lines, first_line=1, stop_at=(), split_modules=False):
+        token_pattern = PATTERNS['token']
+        window = []
+        depth = 0
+        parens = 0
+        in_process = False
+        statement_done = False
+        in_comment = False
 
-        return ''.join(always_block)
+        for line in lines:
+            position = 0
+            line_in_comment = in_comment
+            if in_comment:
+                close = line.find('*/')
+                position = len(line) if close < 0 else close + 2
+                in_comment = close < 0
+
+            # A line whose first token ends a finished process statement (anything
+            # but 'else') starts a new statement, so the window may end before it.
+            first_token = True
+            split = False
+            module_end = False
+            for match in token_pattern.finditer(line, position):
+                kind = match.lastgroup
+                value = match.group()
+                if kind == 'comment':
+                    in_comment = value.startswith('/*') and not value.endswith('*/')
+                    continue
+                if kind != 'identifier' and kind != 'operator':
+                    continue
 
-    def extract_register_assignments(self, always_block, line_number):
-        register_assignment_pattern = r'\b(\w+)\s*=\s*[^;]+\b'
-        assignments = re.findall(register_assignment_pattern, always_block)
-        return [(assignment, line_number + 1) for assignment in assignments]
+                if statement_done:
+                    in_process = value == 'else'
+                    statement_done = False
+                    split = first_token and not in_process and not line_in_comment
+                first_token = False
+                if value in ('begin', 'fork') or value in CASE_KEYWORDS:
+                    depth += 1
+                elif value in ('end', 'join', 'endcase'):
+                    depth = max(depth - 1, 0)
+                    statement_done = in_process and depth == 0
+                elif value == '(':
+                    parens += 1
+                elif value == ')':
+                    parens = max(parens - 1, 0)
+                elif value == ';':
+                    statement_done = in_process and depth == 0 and parens == 0
+                elif value in PROCESS_KEYWORDS:
+                    in_process = True
+                elif value == 'endmodule':
+                    module_end = True
+                    depth = parens = 0
+                    in_process = statement_done = False
+
+            if split and window:
+                if first_line + len(window) in stop_at:
+                    yield first_line, window, True
+                    return
+                if len(window) >= window_lines:
+                    yield first_line, window, True
+                    first_line += len(window)
+                    window = []
+
+            window.append(line)
+            if module_end and split_modules and not in_comment:
+                yield first_line, window, True
+                first_line += len(window)
+                window = []
+                if first_line in stop_at:
+                    return
+                continue
+            at_boundary = depth == 0 and not in_process and not in_comment
+            if at_boundary and first_line + len(window) in stop_at:
+                yield first_line, window, True
+                return
+            if (at_boundary and len(window) >= window_lines) or len(window) >= max_window_lines:
+                yield first_line, window, at_boundary
+                first_line += len(window)
+                window = []
+
+        if window:
+            yield first_line, window, True
 
     # ---------------------------------------------------------------------------------------------------------------------------------------
+    def check_arithmetic_overflow(self, index):
+        self.add_findings(self.arithmetic_overflow_findings(index.line_matches('assignment'), index.symbols))
+
+    def arithmetic_overflow_findings(self, assignments, symbols):
+        overflow_pattern = PATTERNS['overflow']
+
+        def get_bitwidth(value):
+            if value.isnumeric():
+                return 1
+            return symbols.width(value)
+
+        for line_number, signal, value in assignments:
+            match = overflow_pattern.match(value)
+            if not match:
+                continue
+            op1, operator, op2 = match.groups()
+
+            op1_bits = get_bitwidth(op1)
+            op2_bits = get_bitwidth(op2)
+            signal_bits = get_bitwidth(signal)
+
+            if operator == '+' and signal_bits <= max(op1_bits, op2_bits):
+                yield Finding('overflow_add', line_number, signal)
+            elif operator == '-' and signal_bits < max(op1_bits, op2_bits):
+                yield Finding('overflow_sub', line_number, signal)
+            elif operator == '*':
+                if signal_bits < op1_bits + op2_bits:
+                    yield Finding('overflow_mul', line_number, signal)
+            elif operator == '/' and signal_bits < op1_bits:
+                yield Finding('overflow_div', line_number, signal)
+
+    def add_finding(self, rule, line_number, signal=None, *args):
+        self.errors[FINDING_RULES[rule][0]].append(Finding(rule, line_number, signal, args, self.file))
+
+    def add_findings(self, findings):
+        errors = self.errors
+        for finding in findings:
+            finding.file = self.file
+            errors[finding.category].append(finding)
 
-    def check_inferred_latches(self, verilog_code):
-        verilog_code_str = ''.join(verilog_code)
-        lines = verilog_code_str.splitlines()
+    # ---------------------------------------------------------------------------------------------------------------------------------------
+    def check_undefined_registers(self, index):
+        self.add_findings(self.undefined_register_findings(index.line_matches('assignment'), index.symbols))
 
-        self.process_declarations(lines)
+    def undefined_register_findings(self, assignments, symbols):
+        for line_number, signal, _ in assignments:
+            if not symbols.is_defined(signal):
+                yield Finding('undefined_register', line_number, signal)
 
-        for line_number, line in enumerate(lines, start=1):
-            if re.search(r'\balways\s+@', line):
-                always_block = self.extract_always_block(lines, line_number)
-                if re.search(r'\bif\b', always_block):
-                    if not self.has_else_branch(
-                            always_block):
-                        self.errors['Inferred Latches'].append(
-                            (line_number, "Inferred latch found: 'if' statement without an 'else' branch."))
+    # ---------------------------------------------------------------------------------------------------------------------------------------
+    def check_multi_driven_registers(self, index, register_assignments=None):
+        if register_assignments is None:
+            register_assignments = {}
+
+        self.add_findings(self.multi_driven_findings(self.process_drivers(index), register_assignments))
+
+    def multi_driven_findings(self, assignments, register_assignments):
+        for assignment in assignments:
+            register_name = assignment[0]
+            register_line_number = assignment[1]
+
+            if register_name not in register_assignments:
+                register_assignments[register_name] = register_line_number
+            else:
+                previous_line_number = register_assignments[register_name]
+                if previous_line_number != register_line_number:
+                    yield Finding('multi_driven', register_line_number, register_name, (previous_line_number,))
+
+    # (signal, line) once for each always block driving the signal, at the first
+    # line it does so, in line order.
+    def process_drivers(self, index):
+        drivers = []
+        for name, edges in index.signal_graph().drivers.items():
+            processes = set()
+            for line_number, process, _ in edges:
+                if process not in processes and index.blocks[process]['kind'] == 'always':
+                    processes.add(process)
+                    drivers.append((name, line_number))
+        drivers.sort(key=lambda driver: driver[1])
+        return drivers
 
-                if re.search(r'\bcase\b', always_block):
-                    if not self.has_complete_cases(
-                            always_block):
+    # ---------------------------------------------------------------------------------------------------------------------------------------
 
-                        if not self.has_default_case(always_block):
-                            self.errors['Inferred Latches'].append(
-                                (line_number, "Inferred latch found: 'case' statement without a default case."))
+    def check_inferred_latches(self, index):
+        latch_cases = {index.blocks[block_id]['parent'] for block_id in index.case_blocks
+                       if not index.case_coverage(block_id).full}
+        for block_id in index.always_blocks:
+            start_line = index.blocks[block_id]['start']
+            always_block = index.block_text(block_id)
+            if PATTERNS['if'].search(always_block):
+                if not self.has_else_branch(
+                        always_block):
+                    self.add_finding('latch_if', start_line)
 
-    def process_declarations(self, lines):
-        for line in lines:
-            match = re.search(r'\breg\b\s*\[(\d+):(\d+)\]\s*(\w+)\s*;',
-                              line)
-            if match:
-                start_bit = int(match.group(1))
-                end_bit = int(match.group(2))
-                name = match.group(3)
-                size = start_bit - end_bit + 1
-                self.declarations[name] = size
-            if re.search(r'\bendmodule\b', line):
-                break
+            if block_id in latch_cases:
+                self.add_finding('latch_case', start_line)
 
     def has_else_branch(self, always_block):
-        if_match = re.findall(r'\bif\s*\([^)]+\)', always_block)
+        if_match = PATTERNS['if_condition'].findall(always_block)
         for if_statement in if_match:
-            if re.search(r'else', if_statement):
+            if 'else' in if_statement:
                 return True
 
         return False
 
-    def has_default_case(self, always_block):
-        case_match = re.search(r'\bcase\s*\([^)]+\)', always_block)
-        if case_match:
-            case_block = always_block[case_match.end():]
-            return re.search(r'\bdefault\b', case_block)
-
-        return True
-
-    def has_complete_cases(self, always_block):
-        case_match = re.search(r'\bcase\s*\(([^)]+)\)', always_block)
-        if case_match:
-            variable_name = case_match.group(1)
-            case_block = always_block[case_match.end():]
-            case_statements = re.findall(r'(\d+\'[bB][01]+)\s*:\s*', case_block, re.DOTALL)
-            if case_statements:
-                condition_bits = self.declarations.get(variable_name, 1)
-                if len(case_statements) < (
-                        2 ** condition_bits):
-                    return False
-
-        return True
-
     # ---------------------------------------------------------------------------------------------------------------------------------------
-    def check_full_or_parallel_case(self, verilog_code):
-        verilog_code_str = ''.join(verilog_code)
-        lines = verilog_code_str.splitlines()
-
-        self.process_declarations(lines)
-
-        for line_number, line in enumerate(lines, start=1):
-            if re.search(r'\balways\s+@', line):
-                always_block = self.extract_always_block(lines, line_number)
-
-                if re.search(r'\bcase\b', always_block):  # check the case statement
-                    if not self.has_complete_cases(always_block):  # if it doesn't have complete cases
-                        if not self.has_default_case(always_block):  # if it doesn't have default case
-                            self.errors['Non Full Cases'].append(
-                                (line_number, "Non Full Case Found: 'case' statement not full."))
-                if re.search(r'\bcase\b', always_block):
-                    if self.has_non_parallel_cases(always_block):  # if it doesn't have parallel case
-                        self.errors['Non Parallel Cases'].append(
-                            (line_number, "Non Parallel Case Found: 'case' statement not parallel."))
-
-    def has_non_parallel_cases(self, always_block):
-        case_match = re.search(r'\bcase\s*\(([^)]+)\)', always_block)
-        if case_match:
-            case_block = always_block[case_match.end():]
-            case_statements = re.findall(r'(\d+\'[bB][01]+)\s*:\s*', case_block, re.DOTALL)
-            has_duplicates = len(case_statements) != len(
-                set(case_statements))
-            if has_duplicates:
-                return True
+    def check_full_or_parallel_case(self, index):
+        for block_id in index.case_blocks:
+            start_line = index.blocks[block_id]['start']
+            coverage = index.case_coverage(block_id)
+            if not coverage.full:
+                self.add_finding('non_full_case', start_line)
+            if coverage.overlaps:
+                self.add_finding('non_parallel_case', start_line)
 
-        return False
     #--------------------------------------------------------------------------------------------------------
-    def check_duplicate_case_values(self, verilog_code):
-
-        #case_pattern = r'^\s*case\s*\((.*?)\)\s*(.*?)\s*endcase'
+    def check_duplicate_case_values(self, index):
+        for block_id in index.case_blocks:
+            case_block_start = index.blocks[block_id]['start']
+            for value, duplicate_lines in index.case_coverage(block_id).duplicates:
+                self.add_finding('duplicate_case_value', duplicate_lines[0], None,
+                                 value, len(duplicate_lines), tuple(duplicate_lines), case_block_start)
 
-        for line_number, line in enumerate(verilog_code, start=1):
-            if re.search(r'^\s*case', line):
-                case_block_start = line_number
-                case_expr, case_block = self.extract_case_block(verilog_code, case_block_start)
-
-                case_values = re.findall(r'(\d+\'[bB][01]+|\d+\'[hH][0-9A-Fa-f]+)', case_block)
-                case_value_count = defaultdict(int)
-                case_value_line_map = defaultdict(list)
-                for value in case_values:
-                    case_value_count[value] += 1
-                    case_value_line_map[value].append(line_number)
-
-                for value, count in case_value_count.items():
-                    if count > 1:
-                        duplicate_lines = case_value_line_map[value]
-                        self.errors['Duplicate Case Values'].append(
-                            (duplicate_lines[0],
-                             f"Duplicate case value '{value}' found {count} times on lines {', '.join(map(str, duplicate_lines))} in case block starting at line {case_block_start}.")
-                        )
-
-
-    def extract_case_block(self, verilog_code, start_line):
-        case_block = []
-        case_expr = ''
-
-
-        case_expr_match = re.search(r'^\s*case\s*\((.*?)\)', verilog_code[start_line - 1])
-        if case_expr_match:
-            case_expr = case_expr_match.group(1)
-
-        for line_number in range(start_line, len(verilog_code)):
-            line = verilog_code[line_number - 1]
-            case_block.append(line)
-            if 'endcase' in line:
-                break
-
-        return case_expr, ''.join(case_block)
     # ---------------------------------------------------------------------------------------------------------------------------------------
-    def check_uninitialized_registers(self, verilog_code):
-        initialized_regs = set()
-        signal_usage = defaultdict(list)
-
-
-        for line_number, line in enumerate(verilog_code, start=1):
-            reg_name = self.reg_initialized(line)
-            if reg_name:
-                initialized_regs.add(reg_name)
-
-            reg_usage = re.findall(r'(\w+)\s*=\s*([^;]+)', line)
-            for assignment in reg_usage:
-                variable = assignment[0]
-                value = assignment[1]
-                if value.isnumeric() and variable not in initialized_regs:
-                    initialized_regs.add(variable)
-
-
-        for line_number, line in enumerate(verilog_code, start=1):
-            reg_usage = re.findall(r'=\s*([a-zA-Z_]\w*(?:\s*(?:[+\-*/]|and|or)\s*[a-zA-Z_]\w*)*)', line)
-            for assignment in reg_usage:
-                variables = re.findall(r'[a-zA-Z_]\w*', assignment)
-                for variable in variables:
-                    if variable not in initialized_regs:
-                        signal_usage[variable].append(
-                            line_number)
-
-        for signal, lines in signal_usage.items():
-            self.errors['Uninitialized Register Case'].append(
-                (lines[0],
-                 f"Uninitialized register '{signal}' used before initialization. Lines: {', '.join(map(str, lines))}."))
-    def reg_initialized(self, line):
-        match = re.search(r'reg\s+(?:\[\d+:\d+\])?\s*(\w+)\s*=',
-                          line)
-        if match:
-            return match.group(1)
-        return None
+    # A register read before its first write in the source, and not given a
+    # value where it is declared. Streaming mode carries the first write and the
+    # reads of each signal across windows in first_writes and signal_reads.
+    def check_uninitialized_registers(self, index, first_writes=None, signal_reads=None):
+        streaming = signal_reads is not None
+        graph = index.signal_graph()
+        if not streaming:
+            self.report_uninitialized_registers(
+                {name: [line_number for line_number, _ in edges] for name, edges in graph.loads.items()},
+                {name: graph.first_write(name) for name in graph.drivers})
+            return
+
+        for name in graph.drivers:
+            first_writes.setdefault(name, graph.first_write(name))
+        for name, edges in graph.loads.items():
+            signal_reads[name].extend(line_number for line_number, _ in edges)
+
+    def report_uninitialized_registers(self, signal_reads, first_writes):
+        for signal, lines in signal_reads.items():
+            symbol = self.symbols.get(signal)
+            if symbol is None or 'reg' not in symbol.kinds or symbol.initialized:
+                continue
+            first_write = first_writes.get(signal)
+            lines = tuple(dict.fromkeys(line for line in lines if first_write is None or line < first_write))
+            if lines:
+                self.add_finding('uninitialized_register', lines[0], signal, lines)
 
     # -------------------------------------------------------------------------------------------------------------
 
-    def check_incomplete_sensitivity_list(self, verilog_code):
-        warnings = []
-
-
-        always_pattern = r'^\s*always\s*@\((.*?)\)\s*'
-        end_pattern = r'\bend\b'
-
-        total_lines = len(verilog_code)
-
-        for line_number, line in enumerate(verilog_code, start=1):
-            match = re.search(always_pattern, line)
-            if match:
-                sensitivity_list_raw = match.group(1)
-                start_line = line_number
-
-                if '*' in sensitivity_list_raw:
-                    continue
-
-
-                sensitivity_list = {s.strip() for s in re.split(r'[,\s]+', sensitivity_list_raw) if s.strip()}
-
-
-                if 'clk' in sensitivity_list or 'rst' in sensitivity_list:
-                    continue
-
-
-                block_lines = []
-                for block_line_number in range(line_number + 1, total_lines + 1):
-                    block_line = verilog_code[block_line_number - 1]  # Adjust for zero indexing
-                    block_lines.append(block_line)
-                    if re.search(end_pattern, block_line):
-                        break
-
-                block = ''.join(block_lines)  # Join the block into a single string
-
+    def check_incomplete_sensitivity_list(self, index):
+        non_signals = {'if', 'else', 'begin', 'end', 'posedge', 'negedge', 'case', 'endcase', 'default'}
 
-                used_signals = set(re.findall(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b', block))
+        for block_id in index.always_blocks:
+            start_line = index.blocks[block_id]['start']
+            sensitivity_list_raw = index.blocks[block_id]['sensitivity']
+            if sensitivity_list_raw is None or '*' in sensitivity_list_raw:
+                continue
 
+            sensitivity_list = {s.strip() for s in PATTERNS['separator'].split(sensitivity_list_raw) if s.strip()}
 
-                non_signals = {'if', 'else', 'begin', 'end', 'posedge', 'negedge', 'case', 'endcase', 'default'}
-                used_signals -= non_signals
+            if 'clk' in sensitivity_list or 'rst' in sensitivity_list:
+                continue
 
+            used_signals = {value for _, kind, value in index.block_tokens(block_id) if kind == 'identifier'}
+            used_signals -= non_signals
 
-                missing_signals = used_signals - sensitivity_list
+            missing_signals = used_signals - sensitivity_list
 
-
-                if missing_signals:
-                    warnings.append(
-                        f"Line {start_line}: Incomplete sensitivity list: Missing signals {', '.join(missing_signals)} "
-                        f"in block starting at line {start_line}."
-                    )
-
-        if warnings:
-            self.errors['Incomplete Sensitivity List'] = warnings
+            if missing_signals:
+                self.add_finding('incomplete_sensitivity', start_line, None,
+                                 ', '.join(sorted(missing_signals)), start_line)
 
     # ------------------------------------------------------------------------------------------------------------
-    def check_blocking_nonblocking_assignments(self, verilog_code):
-        warnings = []
-
-        verilog_code_str = ''.join(verilog_code)
-
-        always_pattern = r'always\s*@(.*?)\s*begin(.*?)\s*end'
-        always_blocks = re.findall(always_pattern, verilog_code_str, re.DOTALL)
-
-        for sensitivity, block in always_blocks:
-
-            block_lines = block.splitlines()
-            start_line_number = verilog_code_str.count('\n', 0, verilog_code_str.find(block)) + 1
-
-            blocking_assignments = re.findall(r'(\w+)\s*=\s*[^;]+', block)
-            non_blocking_assignments = re.findall(r'(\w+)\s*<=\s*[^;]+', block)
-            is_clocked = 'posedge' in sensitivity or 'negedge' in sensitivity
-
-            if is_clocked:
-                for signal in blocking_assignments:
-                    for idx, line in enumerate(block_lines):
-                        if f"{signal} =" in line:
-                            line_number = start_line_number + idx
-                            warnings.append(
-                                f"Line {line_number}: Blocking assignment ('=') to '{signal}' in clocked block. "
-                                "Consider using non-blocking ('<=').")
-
-            if not is_clocked:
-                for signal in non_blocking_assignments:
-                    for idx, line in enumerate(block_lines):
-                        if f"{signal} <=" in line:
-                            line_number = start_line_number + idx
-                            warnings.append(
-                                f"Line {line_number}: Non-blocking assignment ('<=') to '{signal}' outside clocked block. "
-                                "Consider using blocking ('=').")
-
-        if warnings:
-            self.errors['Blocking assignment errors'] = warnings
+    # Each always block with an event control is clocked if its sensitivity
+    # list has an edge; its assignments are the drivers the dataflow graph found
+    # in the block's token span, nested begin/end and case bodies included.
+    def check_blocking_nonblocking_assignments(self, index):
+        blocks = index.blocks
+        findings = []
+        for signal, edges in index.signal_graph().drivers.items():
+            for line_number, process, kind in edges:
+                block = blocks[process]
+                sensitivity = block.get('sensitivity')
+                if block['kind'] != 'always' or sensitivity is None:
+                    continue
+                is_clocked = 'posedge' in sensitivity or 'negedge' in sensitivity
+                if is_clocked and kind == 'blocking':
+                    findings.append(Finding('blocking_in_clocked', line_number, signal))
+                elif not is_clocked and kind == 'nonblocking':
+                    findings.append(Finding('nonblocking_outside_clocked', line_number, signal))
+        self.add_findings(sorted(findings, key=lambda finding: finding.line))
     #----------------------------------------------------------------------------------------------------------------------
-    def check_potential_race_conditions(self, verilog_code):
-        always_pattern = r'always\s*@(.*?)\s*begin(.*?)\s*end'
-        assign_pattern = r'assign\s+(\w+)\s*=\s*[^;]+;'
-
-        verilog_code_str = ''.join(verilog_code)
-
-        always_blocks = re.finditer(always_pattern, verilog_code_str, re.DOTALL)
-        assigns = re.finditer(assign_pattern, verilog_code_str)
-
-        signal_assignments = {}
-
-        # Process always blocks
-        for block_match in always_blocks:
-            sensitivity, block = block_match.groups()
-            block_start_char = block_match.start()
-            block_start_line = verilog_code_str[:block_start_char].count('\n') + 1
-
-            block_lines = block.split('\n')
-            for i, line in enumerate(block_lines):
-                line_number = block_start_line + i
-                blocking_match = re.findall(r'(\w+)\s*=\s*[^;]+', line)
-                non_blocking_match = re.findall(r'(\w+)\s*<=\s*[^;]+', line)
-
-                for signal in blocking_match + non_blocking_match:
-                    if signal not in signal_assignments:
-                        signal_assignments[signal] = []
-                    signal_assignments[signal].append(line_number)
-
-        # Process assign statements
-        for assign_match in assigns:
-            signal = assign_match.group(1)
-            assign_start_char = assign_match.start()
-            line_number = verilog_code_str[:assign_start_char].count('\n') + 1
-
-            if signal not in signal_assignments:
-                signal_assignments[signal] = []
-            signal_assignments[signal].append(line_number)
-
-        # Check for race conditions
+    def check_potential_race_conditions(self, index, signal_assignments=None):
+        streaming = signal_assignments is not None
+        if not streaming:
+            signal_assignments = {}
+
+        # Every assignment from always blocks and continuous assigns
+        blocks = index.blocks
+        for signal, edges in index.signal_graph().drivers.items():
+            lines = [line_number for line_number, process, _ in edges if blocks[process]['kind'] != 'initial']
+            if lines:
+                signal_assignments.setdefault(signal, []).extend(lines)
+
+        if not streaming:
+            self.report_race_conditions(signal_assignments)
+
+    def report_race_conditions(self, signal_assignments):
         for signal, lines in signal_assignments.items():
             if len(lines) > 1:
-                self.errors['Race Condition'].append(
-                    (lines, f"Signal '{signal}' assigned on lines {', '.join(map(str, lines))}"))
+                self.add_finding('race_condition', lines[0], signal, tuple(lines))
     #-----------------------------------------------------------------------------------------------------------------------
-    def check_array_index_out_of_bounds(self, verilog_code):
-        array_declarations = {}
-        array_access_errors = []
-
-        array_declaration_pattern = r'\b(reg|wire)\s*\[(\d+):(\d+)\]\s*(\w+)\s*\[(\d+):(\d+)\]\s*;'
-        for line_number, line in enumerate(verilog_code, start=1):
-            matches = re.findall(array_declaration_pattern, line)
-            for match in matches:
-                _, upper_data, lower_data, array_name, upper_index, lower_index = match
-                upper_index, lower_index = int(upper_index), int(lower_index)
-                array_size = abs(upper_index - lower_index) + 1
-                array_declarations[array_name] = array_size
-
-        array_access_pattern = r'(\w+)\[(\w+)\]'
-        for line_number, line in enumerate(verilog_code, start=1):
-            matches = re.findall(array_access_pattern, line)
-            for array_name, index in matches:
-                if array_name in array_declarations:
-                    array_size = array_declarations[array_name]
-
-                    if index.isdigit():
-                        index_value = int(index)
-                        if not (0 <= index_value < array_size):
-                            array_access_errors.append(
-                                (line_number,
-                                 f"Array '{array_name}' index {index_value} out of bounds. Valid range: [0:{array_size - 1}].")
-                            )
-                    else:
-                        array_access_errors.append(
-                            (line_number,
-                             f"Potential out of bounds access for array '{array_name}' with variable index '{index}'.")
-                        )
-
-        for error in array_access_errors:
-            self.errors['Array Index Out of Bounds'].append(error)
+    def check_array_index_out_of_bounds(self, index):
+        self.add_findings(self.array_index_findings(index.line_matches('array_access'), index.symbols))
+
+    def array_index_findings(self, accesses, symbols):
+        for line_number, array_name, array_index in accesses:
+            bounds = symbols.array_bounds(array_name)
+            if not bounds:
+                continue
+            upper_index, lower_index = bounds
+            array_size = abs(upper_index - lower_index) + 1
+
+            if array_index.isdigit():
+                index_value = int(array_index)
+                if not (0 <= index_value < array_size):
+                    yield Finding('array_out_of_bounds', line_number, array_name, (index_value, array_size - 1))
+            else:
+                yield Finding('array_variable_index', line_number, array_name, (array_index,))
 
     # ---------------------------------------------------------------------------------------------------------------------------------------
-    def generate_report(self, report_file,file_name):
-        with open(report_file, 'w') as f:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            f.write(f"Lint Report for {file_name} generated at: {timestamp}\n\n")
-
-            for violation, lines in self.errors.items():
-                f.write(f"{violation}:\n")
-                for line in lines:
-                    if isinstance(line, tuple) and len(line) == 2:
-                        line_number, message = line
-                        f.write(f"\tLine {line_number}: {message}\n")
+    def generate_report(self, report_file, file_name, format='text'):
+        generate_batch_report(report_file, {file_name: self.errors}, format=format)
+
+
+# Splits a parenthesized token list at its top-level commas.
+def split_top_level(values):
+    items = [[]]
+    depth = 0
+    for value in values:
+        if value in ('(', '[', '{'):
+            depth += 1
+        elif value in (')', ']', '}'):
+            depth -= 1
+        elif value == ',' and depth == 0:
+            items.append([])
+            continue
+        items[-1].append(value)
+    return [item for item in items if item]
+
+
+def is_signal_name(value):
+    return value not in ITEM_KEYWORDS and PATTERNS['identifier'].fullmatch(value) is not None
+
+
+# '.port(expr)' items become (port, signals) and positional ones (position, signals).
+def port_connections(values):
+    connections = []
+    for position, item in enumerate(split_top_level(values)):
+        if item[0] == '.' and len(item) > 1:
+            connections.append((item[1], tuple(value for value in item[2:] if is_signal_name(value))))
+        else:
+            connections.append((position, tuple(value for value in item if is_signal_name(value))))
+    return connections
+
+
+# Orders the named checks as the registry runs them. Names may leave out the
+# 'check_' prefix.
+def schedule_checks(names):
+    enabled = set()
+    for name in names:
+        check = name if name in VerilogLinter.RULES else f"check_{name}"
+        if check not in VerilogLinter.RULES:
+            raise ValueError(f"Unknown check '{name}'.")
+        enabled.add(check)
+    return tuple(check for check in VerilogLinter.CHECKS if check in enabled)
+
+
+def required_analyses(checks):
+    analyses = set()
+    pending = [analysis for check in checks for analysis in VerilogLinter.RULES[check]]
+    while pending:
+        analysis = pending.pop()
+        if analysis not in analyses:
+            analyses.add(analysis)
+            pending.extend(ANALYSIS_DEPENDENCIES[analysis])
+    return frozenset(analyses)
+
+
+def write_errors(f, errors, file_name=None):
+    for violation, findings in errors.items():
+        f.write(f"{violation}:\n")
+        for finding in findings:
+            if finding.file is None or finding.file == file_name:
+                f.write(f"\tLine {finding.line}: {finding.message}\n")
+            else:
+                f.write(f"\tLine {finding.line} of {finding.file}: {finding.message}\n")
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Report writers. Each one writes findings to f as it walks them, one record
+# at a time, so a report is never assembled in memory.
+def write_text_report(f, results, stats=None):
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    for file_name, errors in results.items():
+        f.write(f"Lint Report for {file_name} generated at: {timestamp}\n\n")
+        write_errors(f, errors, file_name)
+        f.write("\n")
+    if stats is not None:
+        write_profile(f, stats)
+
+
+def finding_record(file_name, violation, finding):
+    return {'file': finding.file or file_name, 'rule': finding.rule, 'category': violation, 'line': finding.line,
+            'column': finding.column, 'signal': finding.signal, 'message': finding.message}
+
+
+def write_jsonl_report(f, results, stats=None):
+    for file_name, errors in results.items():
+        for violation, findings in errors.items():
+            for finding in findings:
+                f.write(json.dumps(finding_record(file_name, violation, finding)))
+                f.write("\n")
+    if stats is not None:
+        f.write(json.dumps({'profile': stats.as_dict()}))
+        f.write("\n")
+
+
+def write_sarif_report(f, results, stats=None):
+    rule_ids = {rule: position for position, rule in enumerate(FINDING_RULES)}
+    driver = {
+        'name': 'VerilogLintingTool',
+        'version': LINTER_VERSION,
+        'rules': [{'id': rule, 'name': category, 'shortDescription': {'text': category}}
+                  for rule, (category, _, _) in FINDING_RULES.items()],
+    }
+    f.write('{"version": "2.1.0", "$schema": "https://json.schemastore.org/sarif-2.1.0.json", "runs": [{')
+    f.write(f'"tool": {json.dumps({"driver": driver})}, "results": [')
+    separator = "\n"
+    for file_name, errors in results.items():
+        for findings in errors.values():
+            for finding in findings:
+                region = {'startLine': finding.line}
+                if finding.column is not None:
+                    region['startColumn'] = finding.column
+                uri = (finding.file or file_name).replace(os.sep, '/')
+                f.write(separator)
+                f.write(json.dumps({
+                    'ruleId': finding.rule,
+                    'ruleIndex': rule_ids[finding.rule],
+                    'level': 'warning',
+                    'message': {'text': finding.message},
+                    'locations': [{'physicalLocation': {'artifactLocation': {'uri': uri}, 'region': region}}],
+                }))
+                separator = ",\n"
+    f.write("\n]")
+    if stats is not None:
+        f.write(f', "properties": {json.dumps({"profile": stats.as_dict()})}')
+    f.write("}]}\n")
+
+
+REPORT_FORMATS = {
+    'text': write_text_report,
+    'jsonl': write_jsonl_report,
+    'sarif': write_sarif_report,
+}
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Per-rule instrumentation, collected only when a linter is created with
+# profile=True. For each rule: how often it ran, its wall time, the source
+# lines it was given, the index entries it read (see ProfiledIndex) and the
+# findings it added. 'SourceIndex' records the tokenize/index pass and
+# 'Preprocessor' the preprocessing; neither reads entries. Match
+# tables are built on first use, so their cost lands on the first rule that
+# asks for them.
+RULE_STAT_FIELDS = ('calls', 'seconds', 'lines', 'matches', 'findings')
+
+
+class LintStats:
+    def __init__(self):
+        self.rules = {}
+        self.files = {}
+
+    def rule(self, name):
+        stats = self.rules.get(name)
+        if stats is None:
+            stats = self.rules[name] = dict.fromkeys(RULE_STAT_FIELDS, 0)
+        return stats
+
+    def add(self, name, seconds, lines=0, matches=0, findings=0, calls=1):
+        stats = self.rule(name)
+        stats['calls'] += calls
+        stats['seconds'] += seconds
+        stats['lines'] += lines
+        stats['matches'] += matches
+        stats['findings'] += findings
+
+    def measure(self, name, errors, call, lines=0, index=None):
+        before = sum(map(len, errors.values()))
+        start = time.perf_counter()
+        call()
+        seconds = time.perf_counter() - start
+        self.add(name, seconds, lines, index.matches if index is not None else 0,
+                 sum(map(len, errors.values())) - before)
+
+    # Folds one file's stats into a batch total, keeping the per-file breakdown.
+    def merge(self, file_path, other):
+        self.files[file_path] = other.rules
+        for name, stats in other.rules.items():
+            self.add(name, **stats)
+
+    def as_dict(self):
+        return {'rules': self.rules, 'files': self.files}
+
+    # Folds in another batch's as_dict(), such as a shard worker's.
+    def merge_dict(self, other):
+        self.files.update(other['files'])
+        for name, stats in other['rules'].items():
+            self.add(name, **stats)
+
+
+# Stands in for a SourceIndex while a rule runs and counts the entries the
+# rule reads: match-table rows, signal-graph edges, case items and block
+# tokens.
+class ProfiledIndex:
+    def __init__(self, index):
+        self.index = index
+        self.matches = 0
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def line_matches(self, name, start_line=None, end_line=None):
+        matches = self.index.line_matches(name, start_line, end_line)
+        self.matches += len(matches)
+        return matches
+
+    def signal_graph(self):
+        return ProfiledGraph(self.index.signal_graph(), self)
+
+    def case_coverage(self, block_id):
+        self.matches += len(self.index.case_items(block_id))
+        return self.index.case_coverage(block_id)
+
+    def block_tokens(self, block_id):
+        tokens = self.index.block_tokens(block_id)
+        self.matches += len(tokens)
+        return tokens
+
+
+# The signal graph as a profiled rule sees it: reading the driver or load
+# table counts its edges.
+class ProfiledGraph:
+    def __init__(self, graph, profiled):
+        self.graph = graph
+        self.profiled = profiled
+
+    def __getattr__(self, name):
+        table = getattr(self.graph, name)
+        if name in ('drivers', 'loads'):
+            self.profiled.matches += sum(map(len, table.values()))
+        return table
+
+
+def write_profile(f, stats):
+    f.write("Profile:\n")
+    f.write(f"\t{'rule':<40} {'calls':>7} {'time ms':>10} {'lines':>10} {'matches':>10} {'findings':>9}\n")
+    for name, rule in sorted(stats.rules.items(), key=lambda item: item[1]['seconds'], reverse=True):
+        matches = rule['matches'] if name in VerilogLinter.RULES else '-'
+        f.write(f"\t{name:<40} {rule['calls']:>7} {rule['seconds'] * 1000:>10.2f} {rule['lines']:>10} "
+                f"{matches:>10} {rule['findings']:>9}\n")
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Incremental re-linting for editors. The source is kept as segments of whole
+# top-level statements, each with its own SourceIndex, its block-rule findings
+# and a per-signal summary (drivers, assignments, reads) for the cross-block
+# rules. A segment also ends at each endmodule, and declarations and signals
+# are keyed by (scope, name) with scope the number of modules ended before the
+# segment, so two modules never share a register, as in parse_verilog. An
+# edit re-indexes only the segments it touches and later segments just move.
+# Block rules re-run where a name's merged declaration changed, and the
+# cross-block rules are recomputed per signal for the signals the edit
+# touched (plus the already flagged ones once lines have moved). Findings
+# are filed under the segment their line is in and kept at their line in the
+# segment's own numbering, so segments that only moved cost nothing when
+# errors is next read.
+#
+# A segment is a run of whole statements, so an edit that leaves a block
+# unclosed (deleting an end or endcase) makes the rest of the module one
+# segment, and every edit below it re-indexes all of that until the block is
+# closed again.
+CROSS_CHECKS = {
+    'check_multi_driven_registers': 'Multi-Driven Registers',
+    'check_potential_race_conditions': 'Race Condition',
+    'check_uninitialized_registers': 'Uninitialized Register Case',
+}
+SUMMARY_FIELDS = ('drivers', 'assignments', 'writes', 'reads')
+
+
+# How far a segment has moved since it was indexed.
+class LineAnchor:
+    __slots__ = ('offset',)
+
+    def __init__(self, offset=0):
+        self.offset = offset
+
+
+# A finding at a line of a segment's index, read at the segment's current
+# position through its anchor.
+class AnchoredFinding(Finding):
+    __slots__ = ('anchor', 'base_line', 'base_args')
+
+    def __init__(self, finding, anchor):
+        self.rule = finding.rule
+        self.file = finding.file
+        self.column = finding.column
+        self.signal = finding.signal
+        self.anchor = anchor
+        self.base_line = finding.line
+        self.base_args = finding.args
+
+    @property
+    def line(self):
+        return self.base_line + self.anchor.offset
+
+    @property
+    def args(self):
+        return shifted_args(self.rule, self.base_args, self.anchor.offset)
+
+
+class IncrementalLinter:
+    def __init__(self, checks=None, segment_lines=128):
+        self.checks = VerilogLinter.CHECKS if checks is None else schedule_checks(checks)
+        self.segment_lines = segment_lines
+        self.lines = []
+        self.segments = []
+        self.positions = {}
+        self.next_segment_id = 0
+        self.symbols = {}
+        self.declaring = defaultdict(set)
+        self.signal_segments = {field: defaultdict(set) for field in SUMMARY_FIELDS}
+        self.cross = {check: {} for check in CROSS_CHECKS if check in self.checks}
+        self.reported = {}
+
+        # Scratch linter the block rules run on, given the merged tables of
+        # the scope it works on.
+        self.rules = VerilogLinter([check for check in self.checks if check not in CROSS_CHECKS])
+
+    def lint(self, lines):
+        self.__init__(self.checks, self.segment_lines)
+        self.update(lines)
+
+    # Replaces lines start_line..end_line (1-based, inclusive) with replacement;
+    # end_line = start_line - 1 inserts before start_line.
+    def edit(self, start_line, end_line, replacement):
+        lines = self.lines[:start_line - 1] + list(replacement) + self.lines[end_line:]
+        self.update(lines, start_line, end_line)
+
+    # Re-lints after the text changed to lines. start_line..end_line, when given,
+    # is the range of old lines that was replaced; otherwise the untouched
+    # segments are found by comparing them with the new text from both ends.
+    def update(self, lines, start_line=None, end_line=None):
+        lines = list(lines)
+        segments = self.segments
+        delta = len(lines) - len(self.lines)
+
+        if start_line is None:
+            first = 0
+            while first < len(segments) and self.segment_unchanged(segments[first], lines, 0):
+                first += 1
+            last = len(segments) - 1
+            while last >= first and self.segment_unchanged(segments[last], lines, delta):
+                last -= 1
+        else:
+            first = self.segment_at(start_line)
+            last = max(self.segment_at(end_line), first - 1)
+        self.lines = lines
+        if first > last and delta == 0:
+            return
+
+        # A segment ends where the next one's first token allowed it to, so the
+        # re-cut starts one segment early and stops at the first cut that lines
+        # up with an untouched segment.
+        low = max(first - 1, 0)
+        region_start = segments[low]['first_line'] if low < len(segments) else 1
+        stop_at = {segment['first_line'] + delta: position
+                   for position, segment in enumerate(segments[last + 1:], start=last + 1)}
+        region = []
+        high = len(segments)
+        for window_start, window, _ in self.rules.stream_windows(
+                lines[region_start - 1:], self.segment_lines, len(lines) + 1, region_start, stop_at,
+                split_modules=True):
+            region.append(self.new_segment(window_start, window))
+            high = stop_at.get(window_start + len(window), high)
+
+        removed = segments[low:high]
+        segments[low:high] = region
+        if delta:
+            for segment in segments[low + len(region):]:
+                segment['first_line'] += delta
+                segment['anchor'].offset += delta
+        rescoped = self.assign_scopes(low, removed, region)
+        self.apply(removed + rescoped, region + segments[len(segments) - len(rescoped):], delta, low,
+                   low + len(region))
+
+    def segment_unchanged(self, segment, lines, delta):
+        start = segment['first_line'] - 1 + delta
+        return start >= 0 and lines[start:start + len(segment['lines'])] == segment['lines']
+
+    def segment_at(self, line_number):
+        starts = [segment['first_line'] for segment in self.segments]
+        return min(max(bisect_right(starts, line_number) - 1, 0), max(len(starts) - 1, 0))
+
+    def new_segment(self, first_line, lines):
+        index = SourceIndex(lines, first_line)
+        segment = {'id': self.next_segment_id, 'first_line': first_line, 'lines': lines, 'index': index,
+                   'anchor': LineAnchor(), 'errors': {}, 'cross': {}, 'identifiers': {value for _, kind, value in index.tokens if kind == 'identifier'},
+                   'ends_module': int(index.endmodule_line <= index.last_line)}
+        self.next_segment_id += 1
+
+        drivers = defaultdict(list)
+        for name, line_number in self.rules.process_drivers(index):
+            drivers[name].append(line_number)
+        segment['drivers'] = drivers
+        segment['assignments'] = {}
+        self.rules.check_potential_race_conditions(index, segment['assignments'])
+        first_writes = {}
+        segment['reads'] = defaultdict(list)
+        self.rules.check_uninitialized_registers(index, first_writes, segment['reads'])
+        segment['writes'] = {name: [line_number] for name, line_number in first_writes.items()}
+        return segment
+
+    # Gives the new segments from position low on their scope. When the edit
+    # added or removed an endmodule, every later segment lands in another scope
+    # and is re-registered like a new one; returns copies of those segments as
+    # they were, to be dropped like the removed ones.
+    def assign_scopes(self, low, removed, added):
+        segments = self.segments
+        scope = segments[low - 1]['scope'] + segments[low - 1]['ends_module'] if low else 0
+        for segment in added:
+            segment['scope'] = scope
+            scope += segment['ends_module']
+        rescoped = []
+        if sum(segment['ends_module'] for segment in removed) != sum(segment['ends_module'] for segment in added):
+            for segment in segments[low + len(added):]:
+                rescoped.append(dict(segment))
+                segment['scope'] = scope
+                scope += segment['ends_module']
+        return rescoped
+
+    # Segments before position low are untouched and those from after on moved
+    # by delta. A cross-rule entry whose lines all moved together keeps its
+    # findings, which follow their segments' anchors; one whose lines span
+    # the edit is recomputed, as line arguments then moved by different amounts.
+    def apply(self, removed, added, delta, low, after):
+        for segment in removed:
+            self.unregister(segment)
+        for segment in added:
+            self.register(segment)
+        self.positions = {segment['id']: position for position, segment in enumerate(self.segments)}
+
+        keys = set()
+        for segment in removed + added:
+            keys.update((segment['scope'], name) for name in segment['index'].declared_names)
+        changed = self.update_declarations(keys)
+        changed_names = defaultdict(set)
+        for scope, name in changed:
+            changed_names[scope].add(name)
+
+        added_ids = {segment['id'] for segment in added}
+        for segment in self.segments:
+            if segment['id'] in added_ids or not changed_names[segment['scope']].isdisjoint(segment['identifiers']):
+                self.run_block_rules(segment)
+
+        touched = set(changed)
+        for segment in removed + added:
+            for field in SUMMARY_FIELDS:
+                touched.update((segment['scope'], name) for name in segment[field])
+        positions = self.positions
+        for check, flagged in self.cross.items():
+            keys = set(touched)
+            if delta:
+                for key, (first, last, _) in flagged.items():
+                    if key in keys:
+                        continue
+                    start = positions.get(first['id'])
+                    end = positions.get(last['id'])
+                    if start is None or end is None or start < low and end >= after:
+                        keys.add(key)
+            category = CROSS_CHECKS[check]
+            for key in keys:
+                self.unplace(category, flagged.pop(key, None))
+                segments, findings = self.cross_findings(check, key)
+                if findings:
+                    flagged[key] = self.place(category, segments, findings)
+        self.reported = None
+
+    # The findings at the current line numbers, built on the first read after
+    # an edit.
+    @property
+    def errors(self):
+        if self.reported is None:
+            self.reported = self.report()
+        return self.reported
+
+    def register(self, segment):
+        scope = segment['scope']
+        for name in segment['index'].declared_names:
+            self.declaring[scope, name].add(segment['id'])
+        for field in SUMMARY_FIELDS:
+            table = self.signal_segments[field]
+            for name in segment[field]:
+                table[scope, name].add(segment['id'])
+
+    def unregister(self, segment):
+        scope = segment['scope']
+        tables = [(self.declaring, segment['index'].declared_names)]
+        tables.extend((self.signal_segments[field], segment[field]) for field in SUMMARY_FIELDS)
+        for table, names in tables:
+            for name in names:
+                key = (scope, name)
+                table[key].discard(segment['id'])
+                if not table[key]:
+                    del table[key]
+
+    def segments_with(self, segment_ids):
+        return [self.segments[position] for position in sorted(self.positions[i] for i in segment_ids)]
+
+    # Re-merges the declarations of the (scope, name) keys; returns the keys
+    # whose entry changed.
+    def update_declarations(self, keys):
+        changed = set()
+        for key in keys:
+            scope, name = key
+            symbols = self.scope_symbols(scope)
+            before = self.declaration_state(symbols, name)
+            symbols.remove(name)
+            for segment in self.segments_with(self.declaring.get(key, ())):
+                symbols.merge(segment['index'].declared_names[name])
+            if self.declaration_state(symbols, name) != before:
+                changed.add(key)
+        return changed
+
+    @staticmethod
+    def declaration_state(symbols, name):
+        symbol = symbols.get(name)
+        return symbol.state() if symbol is not None else None
+
+    def scope_symbols(self, scope):
+        symbols = self.symbols.get(scope)
+        if symbols is None:
+            symbols = self.symbols[scope] = SymbolTable()
+        return symbols
+
+    def run_block_rules(self, segment):
+        rules = self.rules
+        rules.errors = defaultdict(list)
+        index = segment['index']
+        local_symbols = index.symbols
+        index.symbols = rules.symbols = self.scope_symbols(segment['scope'])
+        # Case coverage sizes selectors from declarations that may have changed.
+        index.case_coverages.clear()
+        for check in rules.checks:
+            getattr(rules, check)(index)
+        index.symbols = local_symbols
+        anchor = segment['anchor']
+        segment['errors'] = {violation: [AnchoredFinding(finding, anchor) for finding in findings]
+                             for violation, findings in rules.errors.items()}
+
+    # The current line numbers of a signal in field; segments maps each of them
+    # to its segment.
+    def signal_lines(self, field, key, segments):
+        name = key[1]
+        lines = []
+        for segment in self.segments_with(self.signal_segments[field].get(key, ())):
+            offset = segment['anchor'].offset
+            for line_number in segment[field][name]:
+                lines.append(line_number + offset)
+                segments[line_number + offset] = segment
+        return lines
+
+    def cross_findings(self, check, key):
+        scope, name = key
+        rules = self.rules
+        rules.errors = defaultdict(list)
+        rules.symbols = self.scope_symbols(scope)
+        segments = {}
+        if check == 'check_multi_driven_registers':
+            lines = self.signal_lines('drivers', key, segments)
+            rules.add_findings(rules.multi_driven_findings([(name, line) for line in lines], {}))
+        elif check == 'check_potential_race_conditions':
+            lines = self.signal_lines('assignments', key, segments)
+            rules.report_race_conditions({name: lines})
+        else:
+            lines = self.signal_lines('reads', key, segments)
+            writes = self.signal_lines('writes', key, segments)
+            if lines:
+                rules.report_uninitialized_registers({name: lines}, {name: min(writes)} if writes else {})
+        return segments, rules.errors.get(CROSS_CHECKS[check])
+
+    # Files one signal's cross-rule findings under the segments of their lines,
+    # in line order there. The entry keeps the first and last segment of the
+    # lines they were computed from and the findings as filed.
+    def place(self, category, segments, findings):
+        placed = []
+        for finding in findings:
+            segment = segments[finding.line]
+            anchor = segment['anchor']
+            filed = AnchoredFinding(finding.shifted(-anchor.offset), anchor)
+            segment_findings = segment['cross'].setdefault(category, [])
+            segment_findings.insert(bisect_right([other.base_line for other in segment_findings], filed.base_line),
+                                    filed)
+            placed.append((segment, filed))
+        return segments[min(segments)], segments[max(segments)], placed
+
+    @staticmethod
+    def unplace(category, entry):
+        if entry is None:
+            return
+        for segment, filed in entry[2]:
+            segment_findings = segment['cross'][category]
+            del segment_findings[next(position for position, other in enumerate(segment_findings)
+                                      if other is filed)]
+            if not segment_findings:
+                del segment['cross'][category]
+
+    def report(self):
+        errors = defaultdict(list)
+        for segment in self.segments:
+            for violation, findings in segment['errors'].items():
+                errors[violation].extend(findings)
+            for violation, findings in segment['cross'].items():
+                errors[violation].extend(findings)
+        return dict(errors)
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+VERILOG_EXTENSIONS = ('.v', '.vh', '.sv')
+
+
+def collect_verilog_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in sorted(os.walk(path)):
+                files.extend(os.path.join(directory, name) for name in sorted(names)
+                             if name.endswith(VERILOG_EXTENSIONS))
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path, recursive=True)))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(files))
+
+
+# A file that cannot be read is reported as that file's only finding rather
+# than stopping the run.
+def lint_file(file_path, checks=None, preprocessor=None):
+    linter = VerilogLinter(checks, preprocessor=preprocessor)
+    try:
+        linter.parse_verilog(file_path)
+    except OSError as error:
+        return file_path, unreadable_file_errors(file_path, error)
+    return file_path, dict(linter.errors)
+
+
+def profile_file(file_path, checks=None, preprocessor=None):
+    linter = VerilogLinter(checks, profile=True, preprocessor=preprocessor)
+    try:
+        linter.parse_verilog(file_path)
+    except OSError as error:
+        return file_path, (unreadable_file_errors(file_path, error), linter.stats)
+    return file_path, (dict(linter.errors), linter.stats)
+
+
+def unreadable_file_errors(file_path, error):
+    finding = Finding('unreadable_file', 1, None, (error.strerror or str(error),), sys.intern(file_path))
+    return {finding.category: [finding]}
+
+
+# With a LintStats passed as stats, files are linted with profiling on and
+# each one's stats are merged into it. Cache hits are not re-linted and so
+# have no stats. With a HierarchyIndex, the cross-module port checks run on
+# top; their findings depend on other files and are not cached. With a
+# Preprocessor, files are preprocessed first and cache keys also cover the
+# defines and the headers each file includes.
+def lint_paths(paths, jobs=None, cache=None, checks=None, stats=None, hierarchy=None, preprocessor=None):
+    files = collect_verilog_files(paths)
+    jobs = jobs or os.cpu_count() or 1
+    checks = VerilogLinter.CHECKS if checks is None else schedule_checks(checks)
+
+    results = dict.fromkeys(files)
+    cache_keys = {}
+    if cache is not None:
+        for file_path in files:
+            try:
+                with open(file_path, 'rb') as f:
+                    content = f.read()
+            except OSError:
+                continue
+            if preprocessor is not None:
+                content += b'\0' + preprocessor.dependency_key(file_path, content)
+            cache_keys[file_path] = cache.key(content, checks)
+            results[file_path] = cache.get(cache_keys[file_path], file_path)
+    pending = [file_path for file_path in files if results[file_path] is None]
+
+    worker = partial(lint_file if stats is None else profile_file, checks=checks, preprocessor=preprocessor)
+    if jobs == 1 or len(pending) <= 1:
+        linted = dict(map(worker, pending))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        chunksize = max(1, len(pending) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            linted = dict(executor.map(worker, pending, chunksize=chunksize))
+    if stats is not None:
+        for file_path, (errors, file_stats) in linted.items():
+            linted[file_path] = errors
+            stats.merge(file_path, file_stats)
+    results.update(linted)
+
+    if cache is not None:
+        for file_path in pending:
+            if file_path in cache_keys:
+                cache.put(cache_keys[file_path], results[file_path], file_path)
+        cache.flush()
+    if hierarchy is not None:
+        add_hierarchy_findings(results, hierarchy)
+    return results
+
+
+def generate_batch_report(report_file, results, stats=None, format='text'):
+    with open(report_file, 'w') as f:
+        REPORT_FORMATS[format](f, results, stats)
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Results are keyed by file content, linter version and enabled checks, so a
+# re-run only lints files whose bytes changed. Bump LINTER_VERSION whenever a
+# rule's output changes; the module source hash covers local edits.
+LINTER_VERSION = '1.2.0'
+DEFAULT_CACHE_PATH = os.environ.get(
+    'VERILOG_LINT_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'verilog_lint', 'results.sqlite3'))
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=50000):
+        import sqlite3
+        self.path = path
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The lint server shares one cache between its connection threads, under its own lock.
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, errors TEXT NOT NULL, used REAL NOT NULL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        self.version = linter_fingerprint()
+        self.touched = []
+
+    def key(self, content, checks):
+        return result_key(self.version, content, checks)
+
+    def get(self, key, file=None):
+        row = self.connection.execute('SELECT errors FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        self.touched.append((time.time(), key))
+        return errors_from_rows(json.loads(row[0]), file)
+
+    def put(self, key, errors, file=None):
+        self.connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                                (key, json.dumps(errors_to_rows(errors, file)), time.time()))
+
+    # Writes pending puts and hit timestamps in one transaction, then drops the
+    # least recently used entries beyond max_entries.
+    def flush(self):
+        with self.connection:
+            self.connection.executemany('UPDATE results SET used = ? WHERE key = ?', self.touched)
+            self.touched = []
+            self.connection.execute(
+                'DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY used DESC LIMIT ?)',
+                (self.max_entries,))
+
+    def clear(self):
+        with self.connection:
+            self.connection.execute('DELETE FROM results')
+        self.connection.execute('VACUUM')
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+# A file's findings in the JSON form the result cache and shard artifacts keep.
+def errors_to_rows(errors, file=None):
+    return {violation: [finding.to_row(file) for finding in findings] for violation, findings in errors.items()}
+
+
+def errors_from_rows(rows, file=None):
+    return {violation: [Finding.from_row(entry, file) for entry in entries] for violation, entries in rows.items()}
+
+
+def result_key(version, content, checks):
+    import hashlib
+    digest = hashlib.sha256()
+    digest.update(version.encode())
+    digest.update(','.join(sorted(checks)).encode())
+    digest.update(b'\0')
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def linter_fingerprint():
+    import hashlib
+    with open(__file__, 'rb') as f:
+        return f"{LINTER_VERSION}:{hashlib.sha256(f.read()).hexdigest()}"
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Project-wide module hierarchy. Every module of every indexed file is kept as
+# a summary: its ports (name, direction, width), its instances with their port
+# connections and the first line each signal is driven on in the dataflow
+# graph (so a comparison such as a <= b is not a driver). Summaries are
+# stored per file next to a hash of its bytes, so update() re-parses only files
+# that changed, and cross-module checks find child modules here instead of
+# opening the files that define them.
+DEFAULT_HIERARCHY_PATH = os.environ.get(
+    'VERILOG_LINT_HIERARCHY', os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), 'hierarchy.sqlite3'))
+HIERARCHY_ANALYSES = frozenset({'tokens', 'declarations', 'blocks', 'modules', 'dataflow'})
+
+
+def summarize_modules(verilog_code):
+    summaries = []
+    for index in SourceIndex(verilog_code, analyses=('tokens',)).split_modules(HIERARCHY_ANALYSES):
+        for module in index.modules:
+            drivers = {}
+            for signal, edges in index.signal_graph().drivers.items():
+                lines = [line_number for line_number, _, _ in edges if module['start'] <= line_number <= module['end']]
+                if lines:
+                    drivers[signal] = min(lines)
+
+            ports = []
+            for name in module['ports']:
+                symbol = index.symbols.get(name)
+                direction = next((kind for kind in PORT_KINDS if symbol is not None and kind in symbol.kinds), None)
+                ports.append((name, direction, symbol.width if symbol is not None else 1))
+            summaries.append({'name': module['name'], 'line': module['start'], 'ports': ports,
+                              'instances': module['instances'], 'drivers': drivers})
+    return summaries
+
+
+class HierarchyIndex:
+    def __init__(self, path=DEFAULT_HIERARCHY_PATH):
+        import sqlite3
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, digest TEXT NOT NULL, modules TEXT NOT NULL)')
+        self.version = linter_fingerprint()
+        self.files = None
+        self.modules = None
+
+    # Re-summarizes the files whose bytes changed and drops files that no
+    # longer exist; returns the re-summarized paths.
+    def update(self, files):
+        import hashlib
+        stored = dict(self.connection.execute('SELECT path, digest FROM files'))
+        changed = []
+        with self.connection:
+            for file_path in files:
+                path = os.path.abspath(file_path)
+                try:
+                    with open(file_path, 'rb') as f:
+                        content = f.read()
+                except OSError:
+                    continue
+                digest = hashlib.sha256(self.version.encode() + b'\0' + content).hexdigest()
+                if stored.get(path) == digest:
+                    continue
+                verilog_code = io.StringIO(content.decode(errors='replace'), newline=None).readlines()
+                self.connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?)',
+                                        (path, digest, json.dumps(summarize_modules(verilog_code))))
+                changed.append(file_path)
+            self.connection.executemany('DELETE FROM files WHERE path = ?',
+                                        [(path,) for path in stored if not os.path.exists(path)])
+        self.files = self.modules = None
+        return changed
+
+    def load(self):
+        if self.modules is None:
+            self.files = {}
+            self.modules = {}
+            for path, modules in self.connection.execute('SELECT path, modules FROM files ORDER BY path'):
+                self.files[path] = json.loads(modules)
+                for summary in self.files[path]:
+                    self.modules.setdefault(summary['name'], (path, summary))
+        return self.modules
+
+    def module(self, name):
+        return self.load().get(name)
+
+    # Cross-module findings for the modules defined in files, as (file, finding).
+    def port_driver_findings(self, files):
+        modules = self.load()
+        for file_path in files:
+            for summary in self.files.get(os.path.abspath(file_path), ()):
+                for finding in port_driver_findings(summary, modules):
+                    finding.file = file_path
+                    yield file_path, finding
+
+    def close(self):
+        self.connection.close()
+
+
+# A port is driven from both sides when a child assigns an input port that the
+# parent connects, or when a child's output port drives a signal the parent
+# also drives (by assignment, through its own input port or from another
+# child's output).
+def port_driver_findings(parent, modules):
+    local_drivers = dict(parent['drivers'])
+    for name, direction, _ in parent['ports']:
+        if direction == 'input':
+            local_drivers.setdefault(name, parent['line'])
+
+    output_drivers = defaultdict(list)
+    for child_name, instance_name, line_number, connections in (
+            (instance['module'], instance['name'], instance['line'], instance['connections'])
+            for instance in parent['instances']):
+        entry = modules.get(child_name)
+        if entry is None:
+            continue
+        child = entry[1]
+        directions = {name: direction for name, direction, _ in child['ports']}
+        for port, signals in connections:
+            if isinstance(port, int):
+                if port >= len(child['ports']):
+                    continue
+                port = child['ports'][port][0]
+            direction = directions.get(port)
+            if direction == 'input' and signals and port in child['drivers']:
+                yield Finding('input_port_driven', line_number, port,
+                              (instance_name, child_name, child['drivers'][port]))
+            elif direction == 'output':
+                for signal in signals:
+                    output_drivers[signal].append((port, instance_name, line_number))
+
+    for signal, drivers in output_drivers.items():
+        first_line = local_drivers.get(signal)
+        if first_line is None:
+            first_line = drivers[0][2]
+            drivers = drivers[1:]
+        for port, instance_name, line_number in drivers:
+            yield Finding('output_port_contention', line_number, signal, (port, instance_name, first_line))
+
+
+def add_hierarchy_findings(results, hierarchy):
+    hierarchy.update(list(results))
+    for file_path, finding in hierarchy.port_driver_findings(list(results)):
+        results[file_path].setdefault(finding.category, []).append(finding)
+
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Resident lint server. One process keeps the compiled rules, recent results
+# (in memory, over the SQLite result cache) and an IncrementalLinter with its
+# symbol table for every open editor buffer, and answers requests on a Unix
+# domain socket, one JSON object per line each way:
+#
+#   {"id": 1, "files": ["rtl/top.v"], "buffers": {"edit.v": "module ..."}, "checks": ["inferred_latches"]}
+#   -> {"id": 1, "results": {"rtl/top.v": [finding, ...], "edit.v": [...]}, "errors": {}}
+#
+# Findings are the JSONL report records; errors maps unreadable paths to the
+# reason. Buffers go through the same preprocessing as files, and the server
+# keeps the buffer_entries most recently linted ones. The other commands are
+# {"command": "ping"}, "stats", "close" (with "buffer": name, forgets a buffer)
+# and "shutdown". Each connection is served on its own thread and files
+# missing from the cache are linted on a shared process pool.
+DEFAULT_SOCKET_PATH = os.environ.get(
+    'VERILOG_LINT_SOCKET', os.path.join(os.path.expanduser('~'), '.cache', 'verilog_lint', 'server.sock'))
+
+
+class LintServer:
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, jobs=None, cache=None, memory_entries=4096,
+                 preprocessor=None, buffer_entries=64):
+        import threading
+        self.socket_path = socket_path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = cache
+        self.preprocessor = preprocessor
+        self.version = linter_fingerprint()
+        self.memory = OrderedDict()
+        self.memory_entries = memory_entries
+        self.buffers = OrderedDict()
+        self.buffer_entries = buffer_entries
+        self.lock = threading.Lock()
+        self.executor = None
+        self.server = None
+        self.requests = 0
+
+    def serve_forever(self):
+        import socketserver
+        from concurrent.futures import ProcessPoolExecutor
+        lint_server = self
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except ValueError as error:
+                        request, response = {}, {'id': None, 'error': f"invalid request: {error}"}
                     else:
-                        f.write(f"\tInvalid entry in lines: {line}\n")
-"""
-linter = VerilogLinter()
-root = tk.Tk()
-root.withdraw()
-file_name = filedialog.askopenfilename(
-    title="Select a Verilog file to lint",
-    filetypes=(("Verilog files", "*.v"), ("All files", "*.*"))
-)
-if file_name:
-    linter.parse_verilog(file_name)
-    linter.generate_report('lint_report.txt', file_name)
-    print(f"Linting completed. Report generated as 'lint_report.txt'.")
-else:
-    print("No file selected.")
-"""
-linter = VerilogLinter()
-file_name = "Test cases/"
-linter.parse_verilog(file_name)
-linter.generate_report('lint_report.txt',file_name)
+                        try:
+                            response = lint_server.handle(request)
+                        except Exception as error:
+                            response = {'id': request.get('id') if isinstance(request, dict) else None,
+                                        'error': f"internal error: {type(error).__name__}: {error}"}
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+                    self.wfile.flush()
+                    if isinstance(request, dict) and request.get('command') == 'shutdown':
+                        lint_server.server.shutdown()
+                        return
+
+        self.remove_stale_socket()
+        if os.path.dirname(self.socket_path):
+            os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        self.server = Server(self.socket_path, Handler)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.executor.shutdown()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            if self.cache is not None:
+                self.cache.close()
+
+    def remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        try:
+            send_request({'command': 'ping'}, self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise OSError(f"a lint server is already listening on {self.socket_path}")
+
+    def handle(self, request):
+        if not isinstance(request, dict):
+            return {'id': None, 'error': "invalid request: expected a JSON object"}
+        response = {'id': request.get('id')}
+        command = request.get('command', 'lint')
+        with self.lock:
+            self.requests += 1
+        try:
+            if command == 'lint':
+                response.update(self.lint(request))
+            elif command == 'ping':
+                response['version'] = LINTER_VERSION
+            elif command == 'stats':
+                response['stats'] = {'requests': self.requests, 'results': len(self.memory),
+                                     'buffers': sorted({name for name, _ in self.buffers}), 'jobs': self.jobs}
+            elif command == 'close':
+                name = request['buffer']
+                with self.lock:
+                    for key in [key for key in self.buffers if key[0] == name]:
+                        del self.buffers[key]
+            elif command != 'shutdown':
+                raise ValueError(f"unknown command '{command}'")
+        except (KeyError, TypeError, ValueError) as error:
+            response['error'] = f"{type(error).__name__}: {error}"
+        return response
+
+    def lint(self, request):
+        files = request.get('files', [])
+        buffers = request.get('buffers', {})
+        if not isinstance(files, list) or not all(isinstance(path, str) for path in files):
+            raise TypeError("'files' must be a list of paths")
+        if not isinstance(buffers, dict) or not all(isinstance(text, str) for text in buffers.values()):
+            raise TypeError("'buffers' must map buffer names to their text")
+        if request.get('checks') is not None and not isinstance(request['checks'], list):
+            raise TypeError("'checks' must be a list of check names")
+        checks = VerilogLinter.CHECKS if request.get('checks') is None else schedule_checks(request['checks'])
+        results = {}
+        errors = {}
+        pending = {}
+        for file_path in collect_verilog_files(files):
+            try:
+                with open(file_path, 'rb') as f:
+                    content = f.read()
+                if self.preprocessor is not None:
+                    content += b'\0' + self.preprocessor.dependency_key(file_path, content)
+            except OSError as error:
+                errors[file_path] = str(error)
+                continue
+            key = result_key(self.version, content, checks)
+            results[file_path] = self.cached(key, file_path)
+            if results[file_path] is None:
+                pending[file_path] = (key, self.executor.submit(lint_file, file_path, checks, self.preprocessor))
+        for file_path, (key, future) in pending.items():
+            results[file_path] = future.result()[1]
+            self.store(key, results[file_path], file_path)
+        if pending and self.cache is not None:
+            with self.lock:
+                self.cache.flush()
+
+        for name, text in buffers.items():
+            results[name] = self.lint_buffer(name, text, checks)
+        return {'results': {file_name: [finding_record(file_name, violation, finding)
+                                        for violation, findings in file_errors.items() for finding in findings]
+                            for file_name, file_errors in results.items()},
+                'errors': errors}
+
+    def cached(self, key, file_path):
+        with self.lock:
+            file_errors = self.memory.get(key)
+            if file_errors is not None:
+                self.memory.move_to_end(key)
+                return file_errors
+            if self.cache is not None:
+                file_errors = self.cache.get(key, file_path)
+                if file_errors is not None:
+                    self.remember(key, file_errors)
+            return file_errors
+
+    def store(self, key, file_errors, file_path):
+        with self.lock:
+            self.remember(key, file_errors)
+            if self.cache is not None:
+                self.cache.put(key, file_errors, file_path)
+
+    def remember(self, key, file_errors):
+        self.memory[key] = file_errors
+        if len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    # A buffer keeps its IncrementalLinter between requests, so an edit only
+    # re-analyses the statements it touched. The linter sees the preprocessed
+    # lines and the findings are mapped back like parse_verilog's.
+    def lint_buffer(self, name, text, checks):
+        import threading
+        with self.lock:
+            entry = self.buffers.get((name, checks))
+            if entry is None:
+                entry = self.buffers[name, checks] = (IncrementalLinter(checks), threading.Lock())
+                if len(self.buffers) > self.buffer_entries:
+                    self.buffers.popitem(last=False)
+            else:
+                self.buffers.move_to_end((name, checks))
+        linter, buffer_lock = entry
+        with buffer_lock:
+            lines = text.splitlines(keepends=True)
+            source_map = None
+            if self.preprocessor is not None:
+                lines, source_map, problems = self.preprocessor.preprocess(name, lines)
+            if linter.lines:
+                linter.update(lines)
+            else:
+                linter.lint(lines)
+            errors = linter.errors
+        if source_map is None:
+            return errors
+
+        mapped = VerilogLinter(())
+        mapped.errors = defaultdict(list, {violation: [finding.shifted(0) for finding in findings]
+                                           for violation, findings in errors.items()})
+        for line_number, rule, args in problems:
+            mapped.add_finding(rule, line_number, None, *args)
+        mapped.map_findings(source_map)
+        return dict(mapped.errors)
+
+
+def send_request(request, socket_path=DEFAULT_SOCKET_PATH):
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode() + b"\n")
+        with connection.makefile('rb') as f:
+            return json.loads(f.readline())
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Sharded linting for runs too large for one host's process pool. The
+# coordinator packs the files into shards of about equal size in bytes and
+# serves them over TCP as JSON lines; workers on this or other hosts (which
+# must see the files at the same paths) claim one shard at a time, lint it
+# with lint_paths and send back an artifact: the findings as result cache
+# rows and the profile stats, which merge in any order. Once the queue is
+# empty, an idle worker is handed a second copy of the shard that has run
+# longest and whichever copy finishes first is kept, so one slow or stuck
+# worker does not hold up the run. A worker that disconnects puts the shards
+# it was running back on the queue.
+DEFAULT_SHARDS = 256
+# Copies of one shard that may run at the same time.
+SHARD_COPIES = 2
+# How long an idle worker waits before asking for a shard again, and how long
+# a worker keeps trying to reach a coordinator that is not listening yet.
+SHARD_POLL_SECONDS = 0.5
+SHARD_CONNECT_SECONDS = 30
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"expected HOST:PORT, got '{address}'")
+    return host, int(port)
+
+
+def file_size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+# Each file, largest first, goes to the shard with the fewest bytes so far.
+# The shards are returned largest first, so the longest ones start first.
+def pack_shards(files, count):
+    sizes = {file_path: file_size(file_path) for file_path in files}
+    shards = [[] for _ in range(min(count, len(files)))]
+    heap = [(0, index) for index in range(len(shards))]
+    for file_path in sorted(files, key=sizes.get, reverse=True):
+        total, index = heapq.heappop(heap)
+        shards[index].append(file_path)
+        heapq.heappush(heap, (total + sizes[file_path], index))
+    totals = {index: total for total, index in heap}
+    return [shards[index] for index in sorted(totals, key=totals.get, reverse=True)]
+
+
+class ShardCoordinator:
+    def __init__(self, files, address=('127.0.0.1', 0), shards=DEFAULT_SHARDS, checks=None, stats=None,
+                 preprocessor=None):
+        import socketserver
+        import threading
+        self.files = files
+        self.shards = pack_shards(files, shards)
+        self.stats = stats
+        self.options = {
+            'checks': list(VerilogLinter.CHECKS if checks is None else schedule_checks(checks)),
+            'profile': stats is not None,
+            'preprocessor': None if preprocessor is None else {'include_dirs': list(preprocessor.include_dirs),
+                                                               'defines': preprocessor.defines},
+        }
+        self.queue = deque(range(len(self.shards)))
+        # shard -> (time first claimed, connections running it)
+        self.running = {}
+        self.artifacts = {}
+        self.connections = set()
+        self.error = None
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        if not self.shards:
+            self.finished.set()
+        coordinator = self
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                connection = self.client_address
+                with coordinator.lock:
+                    coordinator.connections.add(connection)
+                try:
+                    for line in self.rfile:
+                        if not line.strip():
+                            continue
+                        try:
+                            response = coordinator.handle(json.loads(line), connection)
+                        except (IndexError, KeyError, TypeError, ValueError) as error:
+                            response = {'error': f"invalid request: {error}"}
+                        self.wfile.write(json.dumps(response).encode() + b"\n")
+                        self.wfile.flush()
+                except OSError:
+                    pass
+                finally:
+                    coordinator.release(connection)
+
+        self.server = Server(address, Handler)
+        self.address = self.server.server_address[:2]
+
+    # Serves shards until every one has an artifact and returns the merged
+    # results in file order. processes are local worker processes; the run
+    # fails if they have all exited and no other worker is connected.
+    def run(self, processes=()):
+        import threading
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            while not self.finished.wait(SHARD_POLL_SECONDS):
+                if processes and not self.connections and all(process.poll() is not None for process in processes):
+                    raise RuntimeError('every shard worker exited before the run finished')
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.error is not None:
+            raise RuntimeError(self.error)
+
+        results = dict.fromkeys(self.files)
+        for artifact in self.artifacts.values():
+            for file_path, rows in artifact['results'].items():
+                results[file_path] = errors_from_rows(rows, file_path)
+            if self.stats is not None and artifact.get('stats') is not None:
+                self.stats.merge_dict(artifact['stats'])
+        return results
+
+    def handle(self, request, connection):
+        command = request['command']
+        if command == 'claim':
+            return self.claim(connection)
+        if command not in ('result', 'failed'):
+            raise ValueError(f"unknown command '{command}'")
+        if request['shard'] not in range(len(self.shards)):
+            raise ValueError(f"no shard {request['shard']}")
+        if command == 'result':
+            self.complete(request['shard'], request)
+        else:
+            with self.lock:
+                self.error = f"shard {request['shard']} failed on {request.get('worker')}: {request['error']}"
+                self.finished.set()
+        return {}
+
+    def claim(self, connection):
+        with self.lock:
+            if self.finished.is_set():
+                return {'done': True}
+            if self.queue:
+                shard = self.queue.popleft()
+            else:
+                running = [shard for shard, (_, runners) in self.running.items()
+                           if connection not in runners and len(runners) < SHARD_COPIES]
+                if not running:
+                    return {'wait': SHARD_POLL_SECONDS}
+                shard = min(running, key=lambda shard: (len(self.running[shard][1]), self.running[shard][0]))
+            self.running.setdefault(shard, (time.monotonic(), set()))[1].add(connection)
+        return {'shard': shard, 'files': self.shards[shard], **self.options}
+
+    # The first artifact of a shard is kept; a later copy's is dropped.
+    def complete(self, shard, artifact):
+        with self.lock:
+            if shard in self.artifacts:
+                return
+            self.artifacts[shard] = artifact
+            self.running.pop(shard, None)
+            if len(self.artifacts) == len(self.shards):
+                self.finished.set()
+
+    def release(self, connection):
+        with self.lock:
+            self.connections.discard(connection)
+            for shard, (_, runners) in list(self.running.items()):
+                runners.discard(connection)
+                if not runners:
+                    del self.running[shard]
+                    self.queue.appendleft(shard)
+
+
+def lint_shard(assignment, jobs=None, cache=None, worker=None):
+    options = assignment['preprocessor']
+    preprocessor = None if options is None else Preprocessor(options['include_dirs'], options['defines'])
+    stats = LintStats() if assignment['profile'] else None
+    try:
+        results = lint_paths(assignment['files'], jobs=jobs, cache=cache, checks=assignment['checks'], stats=stats,
+                             preprocessor=preprocessor)
+    except (OSError, ValueError) as error:
+        return {'command': 'failed', 'shard': assignment['shard'], 'worker': worker,
+                'error': f"{type(error).__name__}: {error}"}
+    return {'command': 'result', 'shard': assignment['shard'], 'worker': worker,
+            'results': {file_path: errors_to_rows(errors, file_path) for file_path, errors in results.items()},
+            'stats': None if stats is None else stats.as_dict()}
+
+
+# Claims and lints shards from the coordinator at address until it has none
+# left or goes away; jobs and cache are this host's own. Returns the number
+# of shards linted.
+def run_shard_worker(address, jobs=None, cache=None, name=None):
+    import socket
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    deadline = time.monotonic() + SHARD_CONNECT_SECONDS
+    while True:
+        try:
+            connection = socket.create_connection(address)
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(SHARD_POLL_SECONDS)
+
+    linted = 0
+    with connection, connection.makefile('rwb') as stream:
+        def request(message):
+            stream.write(json.dumps(message).encode() + b"\n")
+            stream.flush()
+            line = stream.readline()
+            if not line:
+                raise ConnectionError('the coordinator closed the connection')
+            reply = json.loads(line)
+            if 'error' in reply:
+                raise ValueError(reply['error'])
+            return reply
+
+        try:
+            while True:
+                assignment = request({'command': 'claim', 'worker': name})
+                if assignment.get('done'):
+                    return linted
+                if 'wait' in assignment:
+                    time.sleep(assignment['wait'])
+                    continue
+                request(lint_shard(assignment, jobs, cache, name))
+                linted += 1
+        except OSError:
+            return linted
+
+
+# ---------------------------------------------------------------------------------------------------------------------------------------
+# Command line entry point: python lint.py [paths] or python -m lint [paths].
+# Paths may be files, directories or glob patterns; --dialog asks for a file
+# with a Tk file picker instead.
+def select_file_dialog():
+    import tkinter as tk
+    from tkinter import filedialog
+    root = tk.Tk()
+    root.withdraw()
+    file_name = filedialog.askopenfilename(
+        title="Select a Verilog file to lint",
+        filetypes=(("Verilog files", "*.v"), ("All files", "*.*"))
+    )
+    root.destroy()
+    return file_name
+
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(prog='lint', description='Detect errors in Verilog HDL code.')
+    parser.add_argument('paths', nargs='*', help='Verilog files, directories or glob patterns to lint.')
+    parser.add_argument('--dialog', action='store_true', help='Pick the file to lint with a file dialog.')
+    parser.add_argument('-o', '--report', default='lint_report.txt', help='Report file (default: %(default)s).')
+    parser.add_argument('-f', '--format', choices=tuple(REPORT_FORMATS), default='text',
+                        help='Report format (default: %(default)s).')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Worker processes (default: CPU count).')
+    parser.add_argument('--checks', help='Comma-separated checks to run, with or without the check_ prefix '
+                                         '(default: all).')
+    parser.add_argument('--skip', help='Comma-separated checks not to run.')
+    parser.add_argument('--list-checks', action='store_true', help='List the checks and the analyses they use.')
+    parser.add_argument('--stream', action='store_true',
+                        help='Lint each file line by line in bounded memory (no cache, no preprocessing, '
+                             'one process).')
+    parser.add_argument('-I', '--include-dir', action='append', default=[],
+                        help='Directory searched for `include files after the including file\'s own.')
+    parser.add_argument('-D', '--define', action='append', default=[], metavar='NAME[=VALUE]',
+                        help='Define a macro for `ifdef and macro expansion.')
+    parser.add_argument('--no-preprocess', action='store_true',
+                        help='Lint the raw source without expanding `include, `define and `ifdef.')
+    parser.add_argument('--profile', action='store_true',
+                        help='Append per-rule time, lines, matches and findings to the report.')
+    parser.add_argument('--hierarchy', action='store_true',
+                        help='Index module instances and run the cross-module port checks.')
+    parser.add_argument('--hierarchy-path', default=DEFAULT_HIERARCHY_PATH, help='Hierarchy index location.')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the result cache.')
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH, help='Result cache location.')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Empty the result cache before linting (or just empty it when no paths are given).')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run as a resident lint server answering JSON requests on a Unix socket.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help='Lint server socket (default: %(default)s).')
+    parser.add_argument('--coordinate', metavar='HOST:PORT',
+                        help='Pack the files into shards, serve them to --worker processes over TCP and write the '
+                             'merged report (port 0 picks a free port).')
+    parser.add_argument('--shards', type=int, default=DEFAULT_SHARDS,
+                        help='Shards the coordinator packs the files into (default: %(default)s).')
+    parser.add_argument('--local-workers', type=int, default=0,
+                        help='Shard workers the coordinator starts on this machine.')
+    parser.add_argument('--worker', metavar='HOST:PORT',
+                        help='Lint shards from the coordinator at HOST:PORT until it has none left.')
+    return parser
+
+
+# Runs the coordinator for main, with args.local_workers worker processes
+# started through this same command line.
+def coordinate_shards(args, address, paths, checks, stats, preprocessor):
+    import subprocess
+    coordinator = ShardCoordinator(collect_verilog_files(paths), address, args.shards, checks, stats, preprocessor)
+    host, port = coordinator.address
+    print(f"Shard coordinator listening on '{host}:{port}'.", flush=True)
+    command = [sys.executable, os.path.abspath(__file__), '--worker', f"{host}:{port}", '-j', '1']
+    command += ['--no-cache'] if args.no_cache else ['--cache-path', args.cache_path]
+    workers = [subprocess.Popen(command, stdout=subprocess.DEVNULL) for _ in range(args.local_workers)]
+    try:
+        return coordinator.run(workers)
+    except RuntimeError:
+        for worker in workers:
+            worker.terminate()
+        raise
+    finally:
+        for worker in workers:
+            worker.wait()
+
+
+def main(argv=None):
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+
+    if args.list_checks:
+        for check, analyses in VerilogLinter.RULES.items():
+            print(f"{check:<40} {', '.join(analyses)}")
+        return 0
+
+    checks = None
+    try:
+        if args.checks:
+            checks = schedule_checks(name.strip() for name in args.checks.split(',') if name.strip())
+        if args.skip:
+            skipped = schedule_checks(name.strip() for name in args.skip.split(',') if name.strip())
+            checks = tuple(check for check in checks or VerilogLinter.CHECKS if check not in skipped)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.clear_cache:
+        cache = ResultCache(args.cache_path)
+        try:
+            cache.clear()
+        finally:
+            cache.close()
+        if not args.paths and not args.dialog and not args.serve and not args.worker:
+            print(f"Cleared result cache '{args.cache_path}'.")
+            return 0
+
+    preprocessor = None
+    if not args.no_preprocess:
+        preprocessor = Preprocessor(args.include_dir, dict(
+            (definition.split('=', 1) + [''])[:2] for definition in args.define))
+
+    if args.serve:
+        server = LintServer(args.socket, jobs=args.jobs,
+                            cache=None if args.no_cache else ResultCache(args.cache_path), preprocessor=preprocessor)
+        print(f"Lint server listening on '{args.socket}'.", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        except OSError as error:
+            parser.exit(1, f"{parser.prog}: error: {error}\n")
+        return 0
+
+    if args.worker:
+        cache = None if args.no_cache else ResultCache(args.cache_path)
+        try:
+            linted = run_shard_worker(parse_address(args.worker), jobs=args.jobs, cache=cache)
+        except (OSError, ValueError) as error:
+            parser.exit(1, f"{parser.prog}: error: {error}\n")
+        finally:
+            if cache is not None:
+                cache.close()
+        print(f"Linted {linted} shards.")
+        return 0
+
+    paths = list(args.paths)
+    if args.dialog:
+        file_name = select_file_dialog()
+        if not file_name:
+            print("No file selected.")
+            return 1
+        paths.append(file_name)
+    if not paths:
+        parser.error('no input paths given (pass files, directories or globs, or use --dialog)')
+    try:
+        address = parse_address(args.coordinate) if args.coordinate else None
+    except ValueError as error:
+        parser.error(str(error))
+    if args.local_workers and address is None:
+        parser.error('--local-workers needs --coordinate')
+    if args.shards < 1:
+        parser.error('--shards must be at least 1')
+
+    stats = LintStats() if args.profile else None
+    hierarchy = HierarchyIndex(args.hierarchy_path) if args.hierarchy else None
+    try:
+        if args.stream:
+            results = {}
+            for file_path in collect_verilog_files(paths):
+                linter = VerilogLinter(checks, profile=args.profile)
+                try:
+                    linter.parse_verilog_stream(file_path)
+                except OSError as error:
+                    results[file_path] = unreadable_file_errors(file_path, error)
+                    continue
+                results[file_path] = dict(linter.errors)
+                if stats is not None:
+                    stats.merge(file_path, linter.stats)
+            if hierarchy is not None:
+                add_hierarchy_findings(results, hierarchy)
+        elif address is not None:
+            try:
+                results = coordinate_shards(args, address, paths, checks, stats, preprocessor)
+            except (OSError, RuntimeError) as error:
+                parser.exit(1, f"{parser.prog}: error: {error}\n")
+            if hierarchy is not None:
+                add_hierarchy_findings(results, hierarchy)
+        else:
+            cache = None if args.no_cache else ResultCache(args.cache_path)
+            try:
+                results = lint_paths(paths, jobs=args.jobs, cache=cache, checks=checks, stats=stats,
+                                     hierarchy=hierarchy, preprocessor=preprocessor)
+            finally:
+                if cache is not None:
+                    cache.close()
+    finally:
+        if hierarchy is not None:
+            hierarchy.close()
+
+    generate_batch_report(args.report, results, stats, args.format)
+    print(f"Linting completed. Report generated as '{args.report}'.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
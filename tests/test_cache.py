@@ -0,0 +1,64 @@
+# Result cache keys: a file's cached findings are only reused while the
+# headers it includes are unchanged.
+#
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lint import Preprocessor, ResultCache, lint_paths, result_key  # noqa: E402
+
+TOP = 'module top(input a, output reg q);\n`include "body.vh"\nendmodule\n'
+
+
+def write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def file_key(preprocessor, path):
+    with open(path, 'rb') as f:
+        content = f.read()
+    return result_key('test', content + b'\0' + preprocessor.dependency_key(str(path), content), ('check_x',))
+
+
+def test_changed_header_changes_the_key(tmp_path):
+    top = tmp_path / 'top.v'
+    header = tmp_path / 'body.vh'
+    top.write_text(TOP)
+    write(header, "always @(a) if (a) q = 1;\n", 1_000_000_000)
+    preprocessor = Preprocessor()
+    key = file_key(preprocessor, top)
+    assert file_key(preprocessor, top) == key
+    write(header, "always @(a) q = a;\n", 2_000_000_000)
+    assert file_key(preprocessor, top) != key
+    assert file_key(Preprocessor(defines={'FAST': ''}), top) != file_key(preprocessor, top)
+
+
+def test_nested_header_change_reaches_the_key(tmp_path):
+    top = tmp_path / 'top.v'
+    top.write_text(TOP)
+    (tmp_path / 'body.vh').write_text('`include "inner.vh"\n')
+    inner = tmp_path / 'inner.vh'
+    write(inner, "wire w;\n", 1_000_000_000)
+    preprocessor = Preprocessor()
+    key = file_key(preprocessor, top)
+    write(inner, "wire w, v;\n", 2_000_000_000)
+    assert file_key(preprocessor, top) != key
+
+
+def test_cached_run_sees_the_new_header(tmp_path):
+    top = tmp_path / 'top.v'
+    header = tmp_path / 'body.vh'
+    top.write_text(TOP)
+    write(header, "always @(a) if (a) q = 1;\n", 1_000_000_000)
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'))
+    try:
+        checks = ['inferred_latches']
+        run = lint_paths([str(top)], jobs=1, cache=cache, checks=checks, preprocessor=Preprocessor())
+        assert run[str(top)]['Inferred Latches']
+        write(header, "always @(a) q = a;\n", 2_000_000_000)
+        run = lint_paths([str(top)], jobs=1, cache=cache, checks=checks, preprocessor=Preprocessor())
+        assert not run[str(top)].get('Inferred Latches')
+    finally:
+        cache.close()
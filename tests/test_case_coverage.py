@@ -0,0 +1,98 @@
+# Case label parsing and the cube arithmetic behind the full/parallel case,
+# duplicate case and latch checks.
+#
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lint import CASE_WILDCARDS, case_literal, cover_case, cube_minus  # noqa: E402
+
+
+def values(cube, width):
+    value, care = cube
+    return {n for n in range(1 << width) if not (n ^ value) & care}
+
+
+def items_of(*labels):
+    return [(line_number, [[label]]) for line_number, label in enumerate(labels, start=1)]
+
+
+def test_binary_and_hex_labels_are_the_same_cube():
+    assert case_literal("4'b0001", '') == case_literal("4'h1", '') == (4, (1, -1))
+    assert case_literal("4'b0001", '') == case_literal("4'd1", '')
+    assert case_literal("1", '') == (None, (1, -1))
+    assert case_literal("4'b00_01", '') == (4, (1, -1))
+    assert case_literal("state", '') is None
+
+
+def test_binary_and_hex_labels_are_duplicates():
+    coverage = cover_case(items_of("4'b0001", "4'h1"), 4, CASE_WILDCARDS['case'])
+    assert coverage.duplicates == [("4'b0001", [1, 2])]
+    assert coverage.overlaps == [(2, 1)]
+    assert not coverage.full
+
+
+def test_wildcards_depend_on_the_case_kind():
+    width, cube = case_literal("4'b1??0", CASE_WILDCARDS['casez'])
+    assert width == 4 and values(cube, 4) == {0b1000, 0b1010, 0b1100, 0b1110}
+    assert case_literal("4'b1??0", CASE_WILDCARDS['case']) == (4, None)
+    assert case_literal("4'b1xx0", CASE_WILDCARDS['casez']) == (4, None)
+    width, cube = case_literal("4'bx01x", CASE_WILDCARDS['casex'])
+    assert values(cube, 4) == {0b0010, 0b0011, 0b1010, 0b1011}
+    width, cube = case_literal("4'h?", CASE_WILDCARDS['casez'])
+    assert values(cube, 4) == set(range(16))
+
+
+def test_casez_wildcards_cover_and_overlap():
+    wildcards = CASE_WILDCARDS['casez']
+    assert cover_case(items_of("2'b0?", "2'b1?"), 2, wildcards).full
+    coverage = cover_case(items_of("2'b1?", "2'b?1"), 2, wildcards)
+    assert coverage.overlaps == [(2, 1)]
+    assert not coverage.full
+    assert cover_case(items_of("2'b1?") + [(2, None)], 2, wildcards).full
+
+
+def test_overlap_names_the_earliest_label():
+    coverage = cover_case(items_of("3'b1?0", "3'b100", "3'b100"), 3, CASE_WILDCARDS['casez'])
+    assert coverage.overlaps == [(2, 1), (3, 1)]
+
+
+def test_labels_of_one_item_do_not_overlap_each_other():
+    coverage = cover_case([(1, [["2'b0?"], ["2'b00"]]), (2, [["2'b1?"]])], 2, CASE_WILDCARDS['casez'])
+    assert coverage.overlaps == []
+    assert coverage.full
+
+
+def test_wide_casez_selector():
+    wildcards = CASE_WILDCARDS['casez']
+    halves = items_of("64'b0" + '?' * 63, "64'b1" + '?' * 63)
+    assert cover_case(halves, 64, wildcards).full
+    assert not cover_case(halves[:1], 64, wildcards).full
+
+    # 4096 labels that fix the low 12 bits of a 16-bit selector.
+    labels = [f"16'b????{value:012b}" for value in range(4096)]
+    coverage = cover_case(items_of(*labels), 16, wildcards)
+    assert coverage.full
+    assert coverage.overlaps == [] and coverage.duplicates == []
+    coverage = cover_case(items_of(*labels[:-1], "16'b1111111111111111"), 16, wildcards)
+    assert not coverage.full
+    assert coverage.overlaps == []
+    coverage = cover_case(items_of(*labels, "16'h0001"), 16, wildcards)
+    assert coverage.overlaps == [(4097, 2)]
+
+
+def test_cube_minus_leaves_disjoint_pieces():
+    width = 4
+    cubes = [(0, 0), (0b1000, 0b1000), (0b0101, 0b0111), (0b0110, 0b1111), (0b0000, 0b0011)]
+    for cube in cubes:
+        for other in cubes:
+            pieces = cube_minus(cube, other)
+            covered = [values(piece, width) for piece in pieces]
+            assert set().union(*covered) == values(cube, width) - values(other, width)
+            assert sum(map(len, covered)) == len(values(cube, width) - values(other, width))
+
+
+def test_cube_minus_of_a_disjoint_or_covering_cube():
+    assert cube_minus((0b01, 0b11), (0b10, 0b11)) == [(0b01, 0b11)]
+    assert cube_minus((0b101, 0b111), (0b1, 0b1)) == []
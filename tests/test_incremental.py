@@ -0,0 +1,101 @@
+# IncrementalLinter against a fresh lint of the same text after random edits:
+# lines changed, inserted and deleted, including the ones that open and close
+# blocks and modules.
+#
+#   python -m pytest tests
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lint import IncrementalLinter, VerilogLinter  # noqa: E402
+
+MODULE = """module m{n}(input clk, input a, input [1:0] sel, output reg q, output reg [7:0] data);
+    reg [7:0] acc, shadow;
+    reg flag;
+    always @(posedge clk) begin
+        acc <= acc + 8'h01;
+        data = shadow;
+        case (sel)
+            2'b00: q <= a;
+            2'b01: q <= flag;
+        endcase
+    end
+    always @(a) begin
+        if (a) flag = 1;
+        acc = data;
+    end
+    always @(posedge clk)
+        shadow <= acc;
+    assign data = acc & 8'h0f;
+endmodule
+"""
+
+INSERTS = [
+    ["        q = a;\n"],
+    ["    always @(a) begin\n", "        acc = 8'h00;\n", "    end\n"],
+    ["    end\n"],
+    ["endmodule\n"],
+    ["module extra(input a);\n"],
+    ["    reg [3:0] acc;\n"],
+    ["    // note\n"],
+    ["    always @(sel) case (sel) 2'b10: flag = 0; endcase\n"],
+]
+
+
+def normalized(errors):
+    return {violation: sorted((finding.line, finding.message) for finding in findings)
+            for violation, findings in errors.items() if findings}
+
+
+def fresh(lines):
+    linter = VerilogLinter()
+    linter.parse_lines('edit.v', lines)
+    return normalized(linter.errors)
+
+
+def random_edit(linter, rng):
+    line = rng.randint(1, len(linter.lines))
+    kind = rng.choice(['replace', 'insert', 'delete'])
+    if kind == 'replace':
+        linter.edit(line, line, [linter.lines[line - 1].replace('<=', '=', 1).replace('begin', '')])
+    elif kind == 'insert':
+        linter.edit(line, line - 1, rng.choice(INSERTS))
+    else:
+        linter.edit(line, min(line + rng.randint(0, 2), len(linter.lines)), [])
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_random_edits_match_a_full_lint(seed):
+    rng = random.Random(seed)
+    linter = IncrementalLinter(segment_lines=8)
+    linter.lint([line for n in range(4) for line in MODULE.format(n=n).splitlines(keepends=True)])
+    assert normalized(linter.errors) == fresh(linter.lines)
+    for _ in range(40):
+        random_edit(linter, rng)
+        assert normalized(linter.errors) == fresh(linter.lines)
+
+
+def test_update_finds_the_changed_lines_itself():
+    rng = random.Random(7)
+    linter = IncrementalLinter(segment_lines=8)
+    lines = [line for n in range(3) for line in MODULE.format(n=n).splitlines(keepends=True)]
+    linter.lint(lines)
+    for _ in range(30):
+        line = rng.randint(1, len(lines))
+        lines = lines[:line - 1] + rng.choice(INSERTS) + lines[line + rng.randint(-1, 1):]
+        linter.update(lines)
+        assert normalized(linter.errors) == fresh(lines)
+
+
+def test_moved_findings_follow_their_lines():
+    linter = IncrementalLinter(segment_lines=8)
+    linter.lint(MODULE.format(n=0).splitlines(keepends=True))
+    before = normalized(linter.errors)
+    linter.edit(1, 0, ["// header\n", "// header\n"])
+    after = normalized(linter.errors)
+    assert after == fresh(linter.lines)
+    assert {violation: [line for line, _ in findings] for violation, findings in after.items()} == \
+        {violation: [line + 2 for line, _ in findings] for violation, findings in before.items()}
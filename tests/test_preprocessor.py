@@ -0,0 +1,77 @@
+# The preprocessor: line numbers mapped back through `include, multi-line
+# `define and `ifdef, and macros that use themselves.
+#
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lint import Preprocessor, VerilogLinter  # noqa: E402
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def preprocess(path, preprocessor=None):
+    with open(path) as f:
+        return (preprocessor or Preprocessor()).preprocess(path, f.readlines())
+
+
+def output_line(output, text):
+    return next(number for number, line in enumerate(output, start=1) if text in line)
+
+
+def test_include_maps_lines_to_the_header_and_back(tmp_path):
+    header = write(tmp_path / 'defs.vh', "wire from_header_1;\nwire from_header_2;\n")
+    top = write(tmp_path / 'top.v', 'module top;\n`include "defs.vh"\nwire after_include;\nendmodule\n')
+    output, source_map, problems = preprocess(top)
+    assert problems == []
+    assert source_map.locate(output_line(output, 'from_header_2')) == (header, 2)
+    assert source_map.locate(output_line(output, 'after_include')) == (top, 3)
+    assert source_map.locate(output_line(output, 'endmodule')) == (top, 4)
+
+
+def test_multi_line_define_keeps_line_numbers(tmp_path):
+    top = write(tmp_path / 'top.v', "`define SUM(a, b) \\\n    (a + \\\n     b)\nmodule top;\nassign y = `SUM(p, q);\n"
+                                    "endmodule\n")
+    output, source_map, _ = preprocess(top)
+    assert len(output) == 6
+    number = output_line(output, 'assign')
+    assert '(p +' in output[number - 1] and 'q)' in output[number - 1]
+    assert source_map.locate(number) == (top, 5)
+
+
+def test_ifdef_blanks_the_inactive_branch(tmp_path):
+    top = write(tmp_path / 'top.v', "module top;\n`ifdef FAST\nwire fast;\n`else\nwire slow;\n`endif\nendmodule\n")
+    output, source_map, _ = preprocess(top)
+    assert not any('fast' in line for line in output)
+    assert source_map.locate(output_line(output, 'slow')) == (top, 5)
+    output, source_map, _ = preprocess(top, Preprocessor(defines={'FAST': ''}))
+    assert not any('slow' in line for line in output)
+    assert source_map.locate(output_line(output, 'fast')) == (top, 3)
+
+
+def test_findings_in_a_header_point_into_the_header(tmp_path):
+    header = write(tmp_path / 'latch.vh', "always @(a)\n  if (a) q = 1;\n")
+    top = write(tmp_path / 'top.v', 'module top(input a, output reg q);\n`include "latch.vh"\nendmodule\n')
+    linter = VerilogLinter(['check_inferred_latches'], preprocessor=Preprocessor())
+    linter.parse_verilog(top)
+    [finding] = linter.errors['Inferred Latches']
+    assert (finding.file, finding.line) == (header, 1)
+
+
+def test_macro_used_in_its_own_body_is_not_expanded(tmp_path):
+    top = write(tmp_path / 'top.v', "`define A `A `A\nmodule top(output y);\nassign y = `A;\nendmodule\n")
+    output, _, problems = preprocess(top)
+    assert problems == [(3, 'recursive_macro', ('A',))]
+    assert output[2].count('`A') == 2
+
+
+def test_mutually_recursive_macros_stop(tmp_path):
+    top = write(tmp_path / 'top.v', "`define A (`B + 1)\n`define B (`A * 2)\nmodule top(output y);\nassign y = `A;\n"
+                                    "endmodule\n")
+    output, _, problems = preprocess(top)
+    assert problems == [(4, 'recursive_macro', ('A',))]
+    assert output[3].strip() == 'assign y = ((`A * 2) + 1);'
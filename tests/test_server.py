@@ -0,0 +1,104 @@
+# Round trips to a LintServer on a temporary Unix socket, including requests
+# the server has to refuse without dropping the connection.
+#
+#   python -m pytest tests
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lint import LintServer, Preprocessor, finding_record, lint_file, schedule_checks, send_request  # noqa: E402
+
+LATCH = "module top(input a, output reg q);\nalways @(a)\n  if (a) q = 1;\nendmodule\n"
+
+
+@pytest.fixture
+def server():
+    # Unix socket paths are short, so the socket does not go under tmp_path.
+    directory = tempfile.mkdtemp(prefix='lint-server-')
+    socket_path = os.path.join(directory, 'server.sock')
+    lint_server = LintServer(socket_path, jobs=1, preprocessor=Preprocessor())
+    thread = threading.Thread(target=lint_server.serve_forever, daemon=True)
+    thread.start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+    yield socket_path
+    send_request({'command': 'shutdown'}, socket_path)
+    thread.join(10)
+    shutil.rmtree(directory)
+
+
+def raw_requests(socket_path, *lines):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(b''.join(line + b"\n" for line in lines))
+        with connection.makefile('rb') as f:
+            return [json.loads(f.readline()) for _ in lines]
+
+
+def test_files_and_buffers_match_lint_file(server, tmp_path):
+    path = tmp_path / 'top.v'
+    path.write_text(LATCH)
+    checks = schedule_checks(['inferred_latches'])
+    _, file_errors = lint_file(str(path), checks, Preprocessor())
+    expected = [finding_record(str(path), violation, finding)
+                for violation, findings in file_errors.items() for finding in findings]
+    assert expected
+
+    response = send_request({'id': 7, 'files': [str(path)], 'checks': ['inferred_latches']}, server)
+    assert response == {'id': 7, 'results': {str(path): expected}, 'errors': {}}
+    response = send_request({'id': 8, 'buffers': {str(path): LATCH}, 'checks': ['inferred_latches']}, server)
+    assert response['results'][str(path)] == expected
+    response = send_request({'id': 9, 'buffers': {str(path): LATCH.replace('if (a) ', '')},
+                             'checks': ['inferred_latches']}, server)
+    assert response['results'][str(path)] == []
+
+
+def test_unreadable_files_are_reported(server, tmp_path):
+    missing = str(tmp_path / 'missing.v')
+    response = send_request({'id': 1, 'files': [missing]}, server)
+    assert response['results'] == {} and list(response['errors']) == [missing]
+
+
+@pytest.mark.parametrize('line', [
+    b'[1, 2]',
+    b'"x"',
+    b'{not json',
+    b'{"id": 2, "buffers": {"x.v": 3}}',
+    b'{"id": 3, "buffers": ["x.v"]}',
+    b'{"id": 4, "files": "x.v"}',
+    b'{"id": 5, "files": [1]}',
+    b'{"id": 6, "checks": "inferred_latches"}',
+    b'{"id": 7, "checks": ["no_such_check"]}',
+    b'{"id": 8, "command": "close"}',
+    b'{"id": 9, "command": "reboot"}',
+])
+def test_malformed_requests_get_an_error_reply(server, line):
+    # The connection stays open, so a good request on it still gets its answer.
+    refused, answered = raw_requests(server, line, b'{"id": 10, "command": "ping"}')
+    assert 'error' in refused and 'results' not in refused
+    assert answered['id'] == 10 and 'error' not in answered
+
+
+def test_stats_and_close(server):
+    send_request({'buffers': {'a.v': LATCH}}, server)
+    assert send_request({'command': 'stats'}, server)['stats']['buffers'] == ['a.v']
+    send_request({'command': 'close', 'buffer': 'a.v'}, server)
+    assert send_request({'command': 'stats'}, server)['stats']['buffers'] == []
+
+
+def test_unexpected_errors_still_answer(server, monkeypatch):
+    def fail(self, request):
+        raise RuntimeError('boom')
+    monkeypatch.setattr(LintServer, 'lint', fail)
+    response = send_request({'id': 3, 'buffers': {'a.v': LATCH}}, server)
+    assert response == {'id': 3, 'error': 'internal error: RuntimeError: boom'}
+    monkeypatch.undo()
+    assert 'results' in send_request({'id': 4, 'buffers': {'a.v': LATCH}}, server)
@@ -0,0 +1,48 @@
+# A sharded run through the command line, with the coordinator and two local
+# worker processes, against the same files linted with lint_paths.
+#
+#   python -m pytest tests
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lint import Preprocessor, finding_record, lint_paths, main  # noqa: E402
+
+MODULE = """module m{n}(input clk, input a, input [1:0] sel, output reg q);
+    reg [7:0] acc;
+    always @(posedge clk) begin
+        acc = acc + {n};
+        case (sel)
+            2'b00: q <= a;
+        endcase
+    end
+    always @(a) if (a) q = 1;
+`ifdef WIDE
+    wire [`WIDTH-1:0] wide;
+`endif
+endmodule
+"""
+
+
+def make_tree(root, count):
+    for n in range(count):
+        directory = root / f"block{n % 3}"
+        directory.mkdir(exist_ok=True)
+        (directory / f"m{n}.v").write_text(MODULE.format(n=n) * (1 + n % 4))
+    (root / 'block0' / 'broken.v').write_bytes(b'module broken(\n\xff\xfe input a\n')
+
+
+def test_two_local_workers_match_lint_paths(tmp_path):
+    make_tree(tmp_path, 12)
+    report = tmp_path / 'report.jsonl'
+    assert main([str(tmp_path), '--coordinate', '127.0.0.1:0', '--local-workers', '2', '--shards', '5',
+                 '--no-cache', '-D', 'WIDE', '-D', 'WIDTH=8', '-f', 'jsonl', '-o', str(report)]) == 0
+    with open(report) as f:
+        sharded = [json.loads(line) for line in f]
+
+    results = lint_paths([str(tmp_path)], jobs=1, preprocessor=Preprocessor(defines={'WIDE': '', 'WIDTH': '8'}))
+    expected = [finding_record(file_name, violation, finding) for file_name, errors in results.items()
+                for violation, findings in errors.items() for finding in findings]
+    assert expected
+    assert sharded == expected
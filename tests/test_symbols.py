@@ -0,0 +1,34 @@
+# Symbol table declarations: merging redeclared names and sharing the kinds
+# and shapes between names declared alike.
+#
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lint import SourceIndex  # noqa: E402
+
+
+def symbols_of(text):
+    return SourceIndex(text.splitlines(keepends=True)).symbols
+
+
+def test_redeclared_name_merges():
+    symbols = symbols_of("module m(q);\noutput q;\nreg [3:0] q;\nreg mem [0:15];\ninteger i = 0;\nendmodule\n")
+    q = symbols.get('q')
+    assert q.kinds == {'output', 'reg'} and (q.width, q.packed, q.array) == (4, (3, 0), None)
+    mem = symbols.get('mem')
+    assert (mem.width, mem.packed, mem.array) == (1, None, (0, 15))
+    assert symbols.array_bounds('mem') == (0, 15)
+    i = symbols.get('i')
+    assert i.width == 32 and i.initialized and symbols.width('missing') == 1
+
+
+def test_names_declared_alike_share_kinds_and_shape():
+    symbols = symbols_of("module m;\n" + "".join(f"wire [7:0] w_{n};\nwire b_{n};\n" for n in range(50)) +
+                         "endmodule\n")
+    wide = [symbols.get(f"w_{n}") for n in range(50)]
+    narrow = [symbols.get(f"b_{n}") for n in range(50)]
+    assert len({id(symbol.kinds) for symbol in wide + narrow}) == 1
+    assert len({id(symbol.shape) for symbol in wide}) == 1 and wide[0].width == 8
+    assert all(symbol.shape is None and symbol.width == 1 for symbol in narrow)